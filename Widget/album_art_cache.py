@@ -0,0 +1,198 @@
+from PyQt6.QtCore import Qt, QObject, QSize, pyqtSignal
+from PyQt6.QtGui import QImage, QPixmap
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import json
+import os
+import time
+from image_fetcher import ImageFetcher
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.album_art_cache')
+
+class AlbumArtCache(QObject):
+    """Two-tier album art cache keyed by image URL
+
+    Display-ready pixmaps are kept in a bounded in-memory LRU. The original
+    image bytes are kept on disk in a content-addressed store, so art is
+    available instantly after a restart. Concurrent requests for the same
+    URL share a single load. Downloads are asynchronous and can be cancelled;
+    disk access and decoding run on loader threads. All public methods must
+    be called on the GUI thread.
+    """
+    _loaded = pyqtSignal(str, object, object)  # url, scaled QImage or None, (digest, size) or None
+    _missed = pyqtSignal(str)  # url not found on disk
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, pixmap_size=QSize(100, 100),
+                 max_pixmaps=64, max_disk_bytes=200 * 1024 * 1024):
+        super().__init__()
+        self.cache_dir = cache_dir
+        self.objects_dir = os.path.join(cache_dir, 'objects')
+        self.index_path = os.path.join(cache_dir, 'index.json')
+        self.pixmap_size = pixmap_size
+        self.max_pixmaps = max_pixmaps
+        self.max_disk_bytes = max_disk_bytes
+
+        self._pixmaps = OrderedDict()  # url -> QPixmap, least recently used first
+        self._waiters = {}  # url -> callbacks waiting for an in-flight load
+        self._index = self._load_index()
+        self._executor = ThreadPoolExecutor(max_workers=2)
+        self._fetcher = ImageFetcher()
+        self._fetcher.finished.connect(self._on_fetched)
+
+        # Results from the loader threads are delivered on the GUI thread
+        self._loaded.connect(self._on_loaded)
+        self._missed.connect(self._on_missed)
+
+    def _load_index(self):
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            index = {}
+        index.setdefault('urls', {})  # url -> digest
+        index.setdefault('objects', {})  # digest -> {'size', 'used'}
+        index.pop('tracks', None)  # Written by earlier versions
+        return index
+
+    def _save_index(self):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = self.index_path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._index, f)
+            os.replace(tmp_path, self.index_path)
+        except OSError as e:
+            print(f"Error saving album art index: {e}")
+
+    def _object_path(self, digest):
+        return os.path.join(self.objects_dir, digest)
+
+    def pixmap(self, url):
+        """Pixmap for url if it is in memory, without loading anything"""
+        pixmap = self._pixmaps.get(url)
+        if pixmap is not None:
+            self._pixmaps.move_to_end(url)
+        return pixmap
+
+    def request(self, url, callback):
+        """Call callback(pixmap) with the art for url, from memory, disk or network"""
+        pixmap = self.pixmap(url)
+        if pixmap is not None:
+            callback(pixmap)
+            return
+
+        # Share an in-flight load for the same image
+        if url in self._waiters:
+            self._waiters[url].append(callback)
+            return
+        self._waiters[url] = [callback]
+
+        digest = self._index['urls'].get(url)
+        if digest:
+            self._executor.submit(self._read, url, self._object_path(digest))
+        else:
+            self._fetcher.fetch(url)
+
+    def cancel(self, url):
+        """Forget the callbacks waiting for url and stop its download"""
+        self._waiters.pop(url, None)
+        self._fetcher.cancel(url)
+
+    def cancel_all(self, keep=None):
+        """Cancel every pending request except the one for keep"""
+        for url in list(self._waiters):
+            if url != keep:
+                self.cancel(url)
+
+    def _read(self, url, path):
+        """Runs on a loader thread: read and decode an image from the disk store"""
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            self._missed.emit(url)
+            return
+        self._loaded.emit(url, self._decode(data), None)
+
+    def _on_missed(self, url):
+        if url in self._waiters:
+            self._fetcher.fetch(url)
+
+    def _on_fetched(self, url, data):
+        if data is None:
+            self._waiters.pop(url, None)
+            return
+        self._executor.submit(self._process, url, data)
+
+    def _process(self, url, data):
+        """Runs on a loader thread: store downloaded bytes and decode them"""
+        self._loaded.emit(url, self._decode(data), self._store_object(data))
+
+    def _store_object(self, data):
+        """Write image bytes under their content hash; returns (digest, size)"""
+        digest = hashlib.sha1(data).hexdigest()
+        path = self._object_path(digest)
+        try:
+            if not os.path.exists(path):
+                os.makedirs(self.objects_dir, exist_ok=True)
+                tmp_path = f"{path}.{os.getpid()}.tmp"
+                with open(tmp_path, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Error storing album art: {e}")
+            return None
+        return digest, len(data)
+
+    def _decode(self, data):
+        if not data:
+            return None
+        img = QImage()
+        if not img.loadFromData(data):
+            return None
+        return img.scaled(
+            self.pixmap_size,
+            Qt.AspectRatioMode.KeepAspectRatio,
+            Qt.TransformationMode.SmoothTransformation
+        )
+
+    def _on_loaded(self, url, image, entry):
+        callbacks = self._waiters.pop(url, [])
+        digest = self._index['urls'].get(url)
+        if digest in self._index['objects']:
+            self._index['objects'][digest]['used'] = time.time()
+        if entry is not None:
+            digest, size = entry
+            self._index['urls'][url] = digest
+            self._index['objects'][digest] = {'size': size, 'used': time.time()}
+            self._prune_disk()
+            self._save_index()
+
+        if image is None:
+            return
+        pixmap = QPixmap.fromImage(image)
+        if pixmap.isNull():
+            return
+
+        self._pixmaps[url] = pixmap
+        while len(self._pixmaps) > self.max_pixmaps:
+            self._pixmaps.popitem(last=False)
+
+        for callback in callbacks:
+            callback(pixmap)
+
+    def _prune_disk(self):
+        """Delete least recently used images until the store fits its budget"""
+        objects = self._index['objects']
+        total = sum(entry['size'] for entry in objects.values())
+        for digest in sorted(objects, key=lambda d: objects[d]['used']):
+            if total <= self.max_disk_bytes:
+                break
+            total -= objects.pop(digest)['size']
+            try:
+                os.remove(self._object_path(digest))
+            except OSError:
+                pass
+            for url in [u for u, d in self._index['urls'].items() if d == digest]:
+                del self._index['urls'][url]
@@ -0,0 +1,72 @@
+from PyQt6.QtCore import Qt, QObject, QTimer
+from PyQt6.QtWidgets import QApplication
+import time
+
+# Fallback frame rate when the screen does not report a refresh rate
+DEFAULT_FPS = 120
+
+# Longest step integrated at once, so a stalled event loop cannot tunnel a
+# widget through the screen edge in a single tick
+MAX_STEP = 0.1
+
+class AnimationDriver(QObject):
+    """App-wide frame timer that steps every widget currently in motion
+
+    The timer only runs while at least one widget is animating, and each tick
+    passes the real elapsed time from a monotonic clock to the widgets.
+    """
+
+    _instance = None
+
+    @classmethod
+    def instance(cls):
+        """Return the application-wide driver, creating it on first use"""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def __init__(self):
+        super().__init__()
+        self._widgets = []
+        self._last_time = None
+        self._timer = QTimer(self)
+        self._timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self._timer.timeout.connect(self._tick)
+
+    def start(self, widget):
+        """Start stepping widget; it must provide step_animation(dt) -> bool"""
+        if widget not in self._widgets:
+            self._widgets.append(widget)
+        self._timer.setInterval(self.frame_interval())
+        if not self._timer.isActive():
+            self._last_time = time.monotonic()
+            self._timer.start()
+
+    def stop(self, widget):
+        if widget in self._widgets:
+            self._widgets.remove(widget)
+        if not self._widgets:
+            self._timer.stop()
+
+    def is_animating(self, widget):
+        return widget in self._widgets
+
+    def frame_interval(self):
+        """Timer interval in ms matching the fastest screen showing a moving widget"""
+        fps = 0
+        for widget in self._widgets:
+            screen = widget.screen() or QApplication.primaryScreen()
+            if screen is not None:
+                fps = max(fps, screen.refreshRate())
+        if fps <= 0:
+            fps = DEFAULT_FPS
+        return max(1, int(1000 / fps))
+
+    def _tick(self):
+        now = time.monotonic()
+        dt = min(now - self._last_time, MAX_STEP)
+        self._last_time = now
+
+        for widget in list(self._widgets):
+            if not widget.step_animation(dt):
+                self.stop(widget)
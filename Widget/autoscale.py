@@ -0,0 +1,136 @@
+from collections import deque
+import math
+import numpy as np
+
+def _unit_for(value, units):
+    """Largest unit not above value"""
+    return max([u for u in units if u <= value] or [units[0]])
+
+def _nice(value):
+    magnitude = 10.0 ** math.floor(math.log10(value))
+    for step in (1, 2, 5, 10):
+        if step * magnitude >= value * (1 - 1e-9):
+            return step * magnitude
+    return 10 * magnitude
+
+def nice_ceiling(value, units=(1,)):
+    """Smallest 1, 2 or 5 times a power of ten that is at least value
+
+    With units, e.g. (1, 1024) for KB and MB, the steps are counted in the
+    largest unit not above value, so 2 MB is 2048 rather than 2000. Where
+    one of the next unit is closer, as for 1020 KB, that is used instead.
+    """
+    if value <= 0:
+        return 1.0
+    unit = _unit_for(value, units)
+    ceiling = _nice(value / unit) * unit
+    larger = [u for u in units if u > unit]
+    if larger and min(larger) < ceiling:
+        ceiling = float(min(larger))
+    return ceiling
+
+def nice_ticks(scale, count=3, units=(1,)):
+    """Evenly spaced 1-2-5 tick values in (0, scale], about count of them
+
+    Steps are counted in the unit of the scale, so a 2 MB scale has ticks
+    at 1 and 2 MB rather than at 1000 and 2000 KB. Steps below one unit
+    are counted in the unit below instead, so 1 MB has ticks at 500 and
+    1000 KB rather than at 512 KB.
+    """
+    target = scale / (count + 0.5)
+    unit = _unit_for(scale, units)
+    step = _nice(target / unit) * unit
+    if step < unit and unit != min(units):
+        unit = _unit_for(target, units)
+        step = _nice(target / unit) * unit
+    return [step * i for i in range(1, int(scale / step + 1e-9) + 1)]
+
+class SlidingMax:
+    """Maximum of the values pushed during the last span seconds
+
+    The deque holds timestamps and values in decreasing value order; a new
+    value first drops every smaller one, as those can never be the maximum
+    again. Each value is added and removed once, so a push is O(1) amortized.
+    """
+
+    def __init__(self, span):
+        self.span = span
+        self._window = deque()  # (timestamp, value)
+
+    def push(self, timestamp, value):
+        window = self._window
+        while window and window[-1][1] <= value:
+            window.pop()
+        window.append((timestamp, value))
+        self.expire(timestamp)
+
+    def expire(self, now):
+        window = self._window
+        while len(window) > 1 and window[0][0] <= now - self.span:
+            window.popleft()
+
+    def max(self):
+        return self._window[0][1] if self._window else 0.0
+
+    def clear(self):
+        self._window.clear()
+
+class AutoScale:
+    """Maps values onto 0..1 against a 1-2-5 scale that follows the recent maximum
+
+    The scale grows as soon as a value exceeds it, and only shrinks once the
+    maximum over the last span seconds has fallen below `shrink` times the
+    scale, so it does not jitter between neighbouring steps. With log=True
+    values are placed on a log10(1 + value) axis.
+    """
+
+    def __init__(self, span=60, minimum=1.0, headroom=1.1, shrink=0.4, log=False, units=(1,)):
+        self.peak = SlidingMax(span)
+        self.minimum = minimum
+        self.headroom = headroom  # Room above the maximum before the scale steps up
+        self.shrink = shrink
+        self.log = log
+        self.units = units
+        self.scale = nice_ceiling(minimum, units)
+
+    def push(self, timestamp, value):
+        if value == value:  # Skip NaN
+            self.peak.push(timestamp, value)
+
+    def update(self):
+        """Re-evaluate the scale after pushing; returns True if it changed"""
+        peak = self.peak.max() * self.headroom
+        if peak > self.scale or peak < self.scale * self.shrink:
+            scale = self.fit(self.peak.max())
+            if scale != self.scale:
+                self.scale = scale
+                return True
+        return False
+
+    def fit(self, peak):
+        """Scale for a fixed set of values whose maximum is peak"""
+        return nice_ceiling(max(self.minimum, peak * self.headroom), self.units)
+
+    def normalize(self, values, scale=None):
+        """Values as fractions of the graph height"""
+        scale = self.scale if scale is None else scale
+        values = np.asarray(values, dtype=np.float64)
+        if self.log:
+            return np.log10(1 + np.maximum(values, 0)) / math.log10(1 + scale)
+        return values / scale
+
+    def ticks(self, scale=None):
+        """(value, fraction of the graph height) for the axis ticks"""
+        scale = self.scale if scale is None else scale
+        if self.log:
+            # Decades of each unit up to the next unit: 1, 10, 100 KB, 1, 10, 100 MB...
+            # 1000 KB is left out, as it would sit right on top of 1 MB
+            values = []
+            for unit, next_unit in zip(self.units, list(self.units[1:]) + [math.inf]):
+                value = float(unit)
+                while value * 2 < next_unit and value <= scale:
+                    values.append(value)
+                    value *= 10
+        else:
+            values = nice_ticks(scale, units=self.units)
+        return [(value, float(self.normalize(value, scale))) for value in values]
@@ -1,9 +1,17 @@
 from PyQt6.QtWidgets import QWidget, QVBoxLayout, QLabel, QGraphicsBlurEffect, QGraphicsDropShadowEffect, QHBoxLayout, QPushButton
 from PyQt6.QtCore import Qt, QTimer, QRectF, QPointF, QDateTime
-from PyQt6.QtGui import QPainter, QColor, QFont, QPainterPath, QBrush, QLinearGradient, QPen
+from PyQt6.QtGui import QPainter, QColor, QFont, QPainterPath, QBrush, QLinearGradient, QPen, QPixmap
 from PyQt6.QtWidgets import QApplication
+from animation_driver import AnimationDriver
+from instrumentation import instrument_class
 
+@instrument_class
 class BaseWidget(QWidget):
+    def __init_subclass__(cls, **kwargs):
+        # Time paintEvent and update_data of every widget when profiling is enabled
+        super().__init_subclass__(**kwargs)
+        instrument_class(cls)
+    
     def __init__(self, size=(300, 200)):
         super().__init__()
         
@@ -23,15 +31,13 @@ class BaseWidget(QWidget):
         self.velocity = QPointF(0, 0)
         self.last_pos = None
         self.last_time = None
-        self.frame_time = 1000/120  # Target 120 FPS
+        self.frame_time = 1000/120  # Frame time the damping factor is tuned for
         
-        # Animation setup
-        self.animation_timer = QTimer(self)
-        self.animation_timer.timeout.connect(self.update_position)
-        self.animation_timer.setInterval(int(self.frame_time))
+        # Fling animation is stepped by the shared driver with real elapsed time
+        self.animation_driver = AnimationDriver.instance()
         
         # Damping and edge bounce factors
-        self.damping = 0.95  # Velocity damping
+        self.damping = 0.95  # Velocity damping per frame_time
         self.bounce_damping = 0.5  # Edge bounce damping
         self.min_velocity = 0.1  # Minimum velocity before stopping
         self.edge_margin = 20  # Pixels from screen edge for snapping
@@ -69,6 +75,10 @@ class BaseWidget(QWidget):
                 'red': QColor(220, 70, 70)      # Keep red as is
             }
         }
+        
+        # Pre-rendered background, rebuilt when its key changes
+        self._background = None
+        self._background_key = None
     
     def update_screen_bounds(self):
         screen = QApplication.primaryScreen().geometry()
@@ -87,7 +97,7 @@ class BaseWidget(QWidget):
             self.velocity = QPointF(0, 0)
             self.last_pos = self.pos()
             self.last_time = QDateTime.currentMSecsSinceEpoch()
-            self.animation_timer.stop()
+            self.animation_driver.stop(self)
             self.setCursor(Qt.CursorShape.ClosedHandCursor)
     
     def mouseMoveEvent(self, event):
@@ -117,15 +127,15 @@ class BaseWidget(QWidget):
             
             # Start animation if velocity is significant
             if abs(self.velocity.x()) > self.min_velocity or abs(self.velocity.y()) > self.min_velocity:
-                self.animation_timer.start()
+                self.animation_driver.start(self)
     
-    def update_position(self):
+    def step_animation(self, dt):
+        """Advance the fling by dt seconds, returning False once it has come to rest"""
         if self.dragging:
-            self.animation_timer.stop()
-            return
+            return False
         
         # Update position based on velocity
-        new_pos = QPointF(self.pos()) + self.velocity * (self.frame_time / 1000.0)
+        new_pos = QPointF(self.pos()) + self.velocity * dt
         
         # Check screen bounds
         if new_pos.x() < self.screen_bounds.left() + self.edge_margin:
@@ -142,12 +152,12 @@ class BaseWidget(QWidget):
             new_pos.setY(self.screen_bounds.bottom())
             self.velocity.setY(-self.velocity.y() * self.bounce_damping)
         
-        # Apply damping
-        self.velocity *= self.damping
+        # Apply damping scaled to the elapsed time
+        self.velocity *= self.damping ** (dt * 1000.0 / self.frame_time)
         
         # Stop animation if velocity is too low
-        if abs(self.velocity.x()) < self.min_velocity and abs(self.velocity.y()) < self.min_velocity:
-            self.animation_timer.stop()
+        moving = abs(self.velocity.x()) >= self.min_velocity or abs(self.velocity.y()) >= self.min_velocity
+        if not moving:
             self.velocity = QPointF(0, 0)
             
             # Snap to edges if close
@@ -163,9 +173,36 @@ class BaseWidget(QWidget):
         
         # Update widget position
         self.move(int(new_pos.x()), int(new_pos.y()))
+        return moving
+    
+    def background_key(self):
+        """Everything the cached background depends on"""
+        return (
+            self.width(),
+            self.height(),
+            self.devicePixelRatioF(),
+            self.colors['background'].rgba(),
+            self.colors['grid'].rgba(),
+            self.colors['border'].rgba()
+        )
     
     def paintEvent(self, event):
+        key = self.background_key()
+        if key != self._background_key:
+            self._background = self.render_background()
+            self._background_key = key
+        
         painter = QPainter(self)
+        painter.drawPixmap(0, 0, self._background)
+    
+    def render_background(self):
+        """Render the widget chrome into a pixmap at the current device pixel ratio"""
+        dpr = self.devicePixelRatioF()
+        pixmap = QPixmap(round(self.width() * dpr), round(self.height() * dpr))
+        pixmap.setDevicePixelRatio(dpr)
+        pixmap.fill(Qt.GlobalColor.transparent)
+        
+        painter = QPainter(pixmap)
         painter.setRenderHint(QPainter.RenderHint.Antialiasing)
         
         # Create background path
@@ -193,7 +230,10 @@ class BaseWidget(QWidget):
         border_path = QPainterPath()
         border_path.addRoundedRect(1, 1, self.width()-2, self.height()-2, 12, 12)
         painter.strokePath(border_path, QPen(self.colors['border'], 1.5))
+        painter.end()
+        
+        return pixmap
     
-    def update_data(self):
+    def update_data(self, snapshot=None):
         """Override this method in child classes to update widget data"""
         pass 
\ No newline at end of file
@@ -0,0 +1,61 @@
+from collections import namedtuple
+from metrics_backend import default_backend
+
+# Percent at or below which the battery counts as low
+LOW_BATTERY_PERCENT = 20
+
+# Cached battery reading; field names match psutil.sensors_battery()
+BatteryState = namedtuple('BatteryState', ['percent', 'power_plugged', 'secsleft'])
+
+class BatteryModel:
+    """Last battery reading, with a polling interval that follows its state
+
+    poll() reports a change only when the whole percent or the plugged state
+    moves. Polling is slow while plugged in and full, and speeds up while
+    discharging and further still close to the low-battery threshold.
+    """
+    FULL_INTERVAL = 30000  # Plugged in and full
+    CHARGING_INTERVAL = 10000
+    DISCHARGING_INTERVAL = 5000
+    THRESHOLD_INTERVAL = 2000  # Discharging within THRESHOLD_MARGIN of the low threshold
+    NO_BATTERY_INTERVAL = 60000
+    THRESHOLD_MARGIN = 2
+
+    def __init__(self, backend=None):
+        self.backend = backend  # Opened on the first poll if not given
+        self.state = None
+        self.has_battery = True
+
+    def poll(self):
+        """Read the battery once; returns True if the state changed"""
+        try:
+            if self.backend is None:
+                self.backend = default_backend()
+            battery = self.backend.sensors_battery()
+        except Exception as e:
+            print(f"Error reading battery: {e}")
+            return False
+
+        if battery is None:
+            return self.update(None)
+        return self.update(BatteryState(int(battery.percent), bool(battery.power_plugged), battery.secsleft))
+
+    def update(self, state):
+        """Store a BatteryState read elsewhere, or None; returns True if it changed"""
+        self.has_battery = state is not None
+        previous = self.state
+        self.state = state
+        if previous is None or state is None:
+            return previous is not state
+        return previous.percent != state.percent or previous.power_plugged != state.power_plugged
+
+    def interval(self):
+        """Milliseconds until the next poll"""
+        state = self.state
+        if state is None:
+            return self.NO_BATTERY_INTERVAL if not self.has_battery else self.DISCHARGING_INTERVAL
+        if state.power_plugged:
+            return self.FULL_INTERVAL if state.percent >= 100 else self.CHARGING_INTERVAL
+        if state.percent <= LOW_BATTERY_PERCENT + self.THRESHOLD_MARGIN:
+            return self.THRESHOLD_INTERVAL
+        return self.DISCHARGING_INTERVAL
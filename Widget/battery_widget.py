@@ -1,9 +1,11 @@
-from PyQt6.QtWidgets import QVBoxLayout, QLabel, QWidget, QHBoxLayout, QProgressBar
-from PyQt6.QtCore import Qt, QRectF, QTimer, QPointF
-from PyQt6.QtGui import QPainter, QColor, QPen, QPainterPath, QLinearGradient, QConicalGradient
+from PyQt6.QtWidgets import QVBoxLayout, QLabel, QWidget
+from PyQt6.QtCore import Qt
+from PyQt6.QtGui import QPainter, QFont
 from base_widget import BaseWidget
-import psutil
-from PyQt6.QtGui import QFont
+from metrics_sampler import MetricsSampler
+from battery_model import LOW_BATTERY_PERCENT
+from ring_sprite_cache import RingSpriteCache
+from binding import Observable, bind_text, bind_repaint
 
 class BatteryWidget(BaseWidget):
     def __init__(self):
@@ -46,90 +48,44 @@ class BatteryWidget(BaseWidget):
         
         self.layout.addLayout(content_layout)
         
-        # Update timer
-        self.update_timer = QTimer()
-        self.update_timer.timeout.connect(self.update_data)
-        self.update_timer.start(2000)  # Update every 2 seconds
+        # Cached BatteryState, pushed by the sampler only when it changes
+        self.battery = None
+        self.ring_sprites = RingSpriteCache.instance()
         
-        # Initial update
-        self.update_data()
+        # Percent and plugged state drive the labels and the ring
+        self.percent = Observable()
+        self.plugged = Observable()
+        bind_text(self.percentage_label, self.percent,
+                  lambda percent: f"{percent}%" if percent is not None else "N/A")
+        bind_text(self.status_label, self.plugged,
+                  lambda plugged: "No Battery" if plugged is None else "Plugged In" if plugged else "On Battery")
+        bind_repaint(self, self.percent, self.plugged)
+        
+        MetricsSampler.instance().subscribe_battery(self.update_data)
     
-    def update_data(self):
-        battery = psutil.sensors_battery()
-        if battery:
-            percent = int(battery.percent)
-            plugged = battery.power_plugged
-            
-            # Update percentage
-            self.percentage_label.setText(f"{percent}%")
-            
-            # Update status
-            status = "Plugged In" if plugged else "On Battery"
-            self.status_label.setText(status)
-            
-            # Update widget to trigger repaint
-            self.update()
-        else:
-            self.percentage_label.setText("N/A")
-            self.status_label.setText("No Battery")
+    def update_data(self, battery):
+        self.battery = battery
+        self.percent.set(battery.percent if battery else None)
+        self.plugged.set(battery.power_plugged if battery else None)
     
     def paintEvent(self, event):
         super().paintEvent(event)
         
-        painter = QPainter(self)
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-        
-        # Get battery info
-        battery = psutil.sensors_battery()
+        # Use the last sampled battery info
+        battery = self.battery
         if not battery:
             return
-            
-        percent = battery.percent
-        plugged = battery.power_plugged
         
-        # Calculate circle dimensions
-        center = QPointF(self.width() / 2, self.height() / 2)
-        outer_radius = min(self.width(), self.height()) / 2 - 30
-        
-        # Draw background circle
-        painter.setPen(Qt.PenStyle.NoPen)
-        painter.setBrush(QColor(30, 30, 35, 200))
-        painter.drawEllipse(center, outer_radius, outer_radius)
+        # Choose color state
+        if battery.power_plugged:
+            state = 'charging'
+        elif battery.percent <= LOW_BATTERY_PERCENT:
+            state = 'low'
+        else:
+            state = 'normal'
         
-        # Draw battery level arc
-        if percent > 0:
-            # Choose color based on battery state
-            if plugged:
-                color = QColor("#063D08")  # New specified green color
-            elif percent <= 20:
-                color = QColor(255, 50, 50, 200)  # Red for low battery
-            else:
-                color = QColor(200, 200, 200, 200)  # Gray for normal battery
-            
-            # Draw the arc
-            pen = QPen(color, 15, Qt.PenStyle.SolidLine, Qt.PenCapStyle.RoundCap)
-            painter.setPen(pen)
-            
-            # Calculate start and span angles
-            start_angle = 90 * 16
-            span_angle = -int(360 * (percent / 100) * 16)
-            
-            painter.drawArc(QRectF(center.x() - outer_radius, center.y() - outer_radius,
-                                 outer_radius * 2, outer_radius * 2),
-                          start_angle, span_angle)
-            
-            # Draw charging indicator if plugged in
-            if plugged:
-                painter.setPen(QPen(color, 2.5))
-                painter.setBrush(color)
-                bolt_path = QPainterPath()
-                bolt_size = outer_radius * 0.15
-                
-                # Position the bolt above the percentage text
-                bolt_y_offset = 20  # Adjust this value to move the bolt up/down
-                bolt_path.moveTo(center.x(), center.y() - bolt_size - bolt_y_offset)
-                bolt_path.lineTo(center.x() - bolt_size/2, center.y() - bolt_y_offset)
-                bolt_path.lineTo(center.x(), center.y() + bolt_size/3 - bolt_y_offset)
-                bolt_path.lineTo(center.x() + bolt_size/2, center.y() - bolt_y_offset)
-                bolt_path.lineTo(center.x(), center.y() - bolt_size - bolt_y_offset)
-                painter.drawPath(bolt_path) 
\ No newline at end of file
+        # The ring is a single pre-rendered sprite blit
+        origin, sprite = self.ring_sprites.sprite(
+            battery.percent, state, self.devicePixelRatioF(), self.width(), self.height())
+        painter = QPainter(self)
+        painter.drawPixmap(origin, sprite)
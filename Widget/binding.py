@@ -0,0 +1,122 @@
+from PyQt6.QtCore import Qt, QObject, QTimer
+from PyQt6.QtGui import QRegion
+from animation_driver import AnimationDriver
+
+class FrameScheduler(QObject):
+    """Runs dirty bindings at most once per frame
+
+    Bindings marked dirty during a frame are queued once each and applied
+    together when the frame timer fires. Repaint requests are merged into
+    one region per widget, so only the changed parts are repainted.
+    """
+
+    _instance = None
+
+    @classmethod
+    def instance(cls):
+        """Return the application-wide scheduler, creating it on first use"""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def __init__(self):
+        super().__init__()
+        self._pending = {}  # Binding -> None, in the order they were marked
+        self._regions = {}  # Widget -> QRegion to repaint, or None for the whole widget
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self._timer.timeout.connect(self.flush)
+
+    def schedule(self, binding):
+        self._pending[binding] = None
+        if not self._timer.isActive():
+            self._timer.start(AnimationDriver.instance().frame_interval())
+
+    def request_repaint(self, widget, rect=None):
+        """Repaint rect of widget, or all of it, when the frame is flushed"""
+        if widget in self._regions:
+            region = self._regions[widget]
+            if region is not None and rect is not None:
+                self._regions[widget] = region.united(rect)
+            else:
+                self._regions[widget] = None
+        else:
+            self._regions[widget] = QRegion(rect) if rect is not None else None
+
+    def flush(self):
+        """Apply every dirty binding and issue the merged repaints now"""
+        self._timer.stop()
+        pending = self._pending
+        self._pending = {}
+        for binding in pending:
+            binding.apply()
+
+        regions = self._regions
+        self._regions = {}
+        for widget, region in regions.items():
+            if region is None:
+                widget.update()
+            else:
+                widget.update(region)
+
+# Initial value of an Observable, so the first set always counts as a change
+_UNSET = object()
+
+class Observable:
+    """Value that marks its bindings dirty when set to something different"""
+
+    def __init__(self, value=_UNSET):
+        self._value = value
+        self._bindings = []
+
+    @property
+    def value(self):
+        return None if self._value is _UNSET else self._value
+
+    def set(self, value):
+        """Store value; returns False and does nothing if it is unchanged"""
+        if value == self._value:
+            return False
+        self._value = value
+        for binding in self._bindings:
+            binding.mark_dirty()
+        return True
+
+class Binding:
+    """Calls apply_func with the current source values once per dirty frame"""
+
+    def __init__(self, sources, apply_func):
+        self.sources = sources
+        self.apply_func = apply_func
+        self.scheduler = FrameScheduler.instance()
+        for source in sources:
+            source._bindings.append(self)
+
+    def mark_dirty(self):
+        self.scheduler.schedule(self)
+
+    def apply(self):
+        self.apply_func(*[source.value for source in self.sources])
+
+    def unbind(self):
+        for source in self.sources:
+            if self in source._bindings:
+                source._bindings.remove(self)
+
+def bind_text(label, source, formatter=str):
+    """Keep label's text equal to formatter(source.value)
+
+    setText is skipped when the formatted text did not change, so a label
+    is neither relaid out nor repainted for readings that round the same.
+    """
+    def apply(value):
+        text = formatter(value)
+        if text != label.text():
+            label.setText(text)
+    return Binding([source], apply)
+
+def bind_repaint(widget, *sources, rect=None):
+    """Repaint widget, or only rect of it, once per frame in which a source changed"""
+    scheduler = FrameScheduler.instance()
+    return Binding(list(sources), lambda *values: scheduler.request_repaint(widget, rect))
@@ -0,0 +1,464 @@
+"""Out-of-process metrics collector
+
+Samples the system once per machine and publishes the readings into
+shared-memory ring buffers that any number of widget processes or CLI
+readers can map:
+
+    python collector.py              # run the collector
+    python collector.py --read       # print samples from a running collector
+"""
+from multiprocessing import shared_memory
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import time
+import numpy as np
+import psutil
+from metrics_backend import default_backend, InterfaceCounters
+from battery_model import BatteryModel, BatteryState
+from network_rates import NetworkRateEstimator
+from metric_history import MetricHistory, DEFAULT_DIR
+
+DEFAULT_NAME = 'desktop_widgets'
+MAGIC = 0x57444731  # "WDG1"
+VERSION = 2
+
+METRICS_INTERVAL = 1.0
+NETWORK_INTERVAL = 0.25
+# An hour of snapshots. Per-core readings make up most of each record, about
+# 1 KB, so the ring takes about 3.8 MB of shared memory on any machine.
+METRICS_CAPACITY = 3600
+NETWORK_CAPACITY = 256  # About a minute of network reads
+
+HEARTBEAT_INTERVAL = 10.0  # Seconds between reader check-ins while not reading
+STALL_TIMEOUT = 5 * METRICS_INTERVAL  # Readers look for a new collector after this long without records
+STALE_AFTER = 60.0  # Rings unwritten this long were left behind by a collector that was killed
+
+MAX_INTERFACES = 16
+MAX_CORES = 256  # Further cores are left out of per-core readings
+INTERFACE_NAME_BYTES = 32
+
+# Ring header; seq is odd while the writer is updating a record
+HEADER_DTYPE = np.dtype([
+    ('magic', '<u4'),
+    ('version', '<u4'),
+    ('seq', '<u8'),
+    ('head', '<u8'),  # Records written so far
+    ('capacity', '<u8'),
+    ('writer_pid', '<i8'),
+    ('reader_heartbeat', '<f8'),  # time.monotonic() of the last read by any reader
+])
+
+METRICS_DTYPE = np.dtype([
+    ('timestamp', '<f8'),  # time.monotonic(), shared by all processes on the machine
+    ('cpu_percent', '<f8'),
+    ('cpu_count', '<u2'),  # Number of valid per-core readings
+    ('cpu_per_core', '<f4', (MAX_CORES,)),
+    ('memory_percent', '<f8'),
+    ('battery_percent', '<i2'),  # -1 without a battery
+    ('battery_plugged', 'u1'),
+    ('battery_secsleft', '<i8'),
+])
+
+NETWORK_DTYPE = np.dtype([
+    ('timestamp', '<f8'),
+    ('count', '<u2'),  # Number of valid interfaces
+    ('names', f'S{INTERFACE_NAME_BYTES}', (MAX_INTERFACES,)),
+    ('bytes_sent', '<u8', (MAX_INTERFACES,)),
+    ('bytes_recv', '<u8', (MAX_INTERFACES,)),
+])
+
+def _attach(name):
+    """Open existing shared memory without letting this process unlink it on exit"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Before Python 3.13 every attached process registers the segment for cleanup
+        shm = shared_memory.SharedMemory(name=name)
+        if os.name == 'posix':
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(shm._name, 'shared_memory')
+        return shm
+
+class SharedRing:
+    """Single-writer ring of fixed-size numpy records in shared memory
+
+    The writer makes seq odd, writes the record and the new head, then makes
+    seq even again. Readers take their numpy views of the mapped buffer and
+    accept what they read only if seq was even and unchanged around it, so
+    they never block the writer and never see a torn record.
+    """
+    RETRIES = 100
+
+    def __init__(self, shm, dtype, owner=False):
+        self.shm = shm
+        self.owner = owner
+        self.header = np.ndarray((), HEADER_DTYPE, buffer=shm.buf)
+        capacity = int(self.header['capacity'])
+        self.records = np.ndarray((capacity,), dtype, buffer=shm.buf, offset=HEADER_DTYPE.itemsize)
+        self.capacity = capacity
+
+    @classmethod
+    def create(cls, name, dtype, capacity):
+        size = HEADER_DTYPE.itemsize + dtype.itemsize * capacity
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        header = np.ndarray((), HEADER_DTYPE, buffer=shm.buf)
+        header['capacity'] = capacity
+        header['seq'] = 0
+        header['head'] = 0
+        header['writer_pid'] = os.getpid()
+        header['reader_heartbeat'] = time.monotonic()
+        header['version'] = VERSION
+        header['magic'] = MAGIC  # Last, so readers only accept a fully set up header
+        del header
+        return cls(shm, dtype, owner=True)
+
+    @classmethod
+    def attach(cls, name, dtype):
+        shm = _attach(name)
+        header = np.ndarray((), HEADER_DTYPE, buffer=shm.buf)
+        valid = header['magic'] == MAGIC and header['version'] == VERSION
+        del header
+        if not valid:
+            shm.close()
+            raise ValueError(f"Shared memory {name} is not a compatible metrics ring")
+        return cls(shm, dtype)
+
+    def write(self, fill):
+        """Call fill(record) on the next slot under the seqlock"""
+        header = self.header
+        head = int(header['head'])
+        header['seq'] += 1
+        fill(self.records[head % self.capacity])
+        header['head'] = head + 1
+        header['seq'] += 1
+
+    def read_since(self, head):
+        """(records written after head, new head); records is a copy of at most capacity"""
+        header = self.header
+        for _ in range(self.RETRIES):
+            seq = int(header['seq'])
+            if seq & 1:
+                time.sleep(0)
+                continue
+            end = int(header['head'])
+            start = max(head, end - self.capacity)
+            if start >= end:
+                records = self.records[:0].copy()
+            else:
+                indices = np.arange(start, end) % self.capacity
+                records = self.records[indices]  # Fancy indexing copies
+            if int(header['seq']) == seq:
+                header['reader_heartbeat'] = time.monotonic()
+                return records, end
+        return self.records[:0].copy(), head
+
+    def view(self):
+        """Zero-copy (records, seq, head) of the whole ring
+
+        The view is only consistent if validate(seq) is still True after use.
+        Records are in slot order; the newest is at (head - 1) % capacity.
+        """
+        header = self.header
+        while True:
+            seq = int(header['seq'])
+            if not seq & 1:
+                return self.records, seq, int(header['head'])
+            time.sleep(0)
+
+    def validate(self, seq):
+        return int(self.header['seq']) == seq
+
+    def close(self):
+        del self.header
+        del self.records
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+class CollectorReader:
+    """Attaches to a running collector's rings"""
+
+    def __init__(self, name=DEFAULT_NAME):
+        self.name = name
+        self.metrics = SharedRing.attach(f"{name}_metrics", METRICS_DTYPE)
+        try:
+            self.network = SharedRing.attach(f"{name}_network", NETWORK_DTYPE)
+        except Exception:
+            self.metrics.close()
+            raise
+        # Start from the newest record
+        self.metrics_head = max(int(self.metrics.header['head']) - 1, 0)
+        self.network_head = max(int(self.network.header['head']) - 1, 0)
+
+    def read_metrics(self):
+        """New metrics records as a numpy structured array"""
+        records, self.metrics_head = self.metrics.read_since(self.metrics_head)
+        return records
+
+    def heartbeat(self):
+        """Tell the collector this reader is still attached without reading"""
+        self.metrics.header['reader_heartbeat'] = time.monotonic()
+
+    def writer_running(self):
+        """Whether the process that created the rings is still running"""
+        pid = int(self.metrics.header['writer_pid'])
+        try:
+            # A collector started by this process stays a zombie until reaped
+            return psutil.Process(pid).status() != psutil.STATUS_ZOMBIE
+        except psutil.Error:
+            return False
+
+    def last_write_age(self):
+        """Seconds since the newest metrics record, or None before the first one"""
+        records, seq, head = self.metrics.view()
+        if not head:
+            return None
+        return time.monotonic() - float(records[(head - 1) % self.metrics.capacity]['timestamp'])
+
+    def stalled(self, timeout=STALL_TIMEOUT):
+        """Whether the collector has exited or written nothing for timeout seconds"""
+        if not self.writer_running():
+            return True
+        age = self.last_write_age()
+        return age is not None and age > timeout
+
+    def read_network(self):
+        """New network reads as (timestamp, {name: InterfaceCounters}) pairs"""
+        records, self.network_head = self.network.read_since(self.network_head)
+        reads = []
+        for record in records:
+            count = int(record['count'])
+            names = record['names'][:count]
+            sent = record['bytes_sent'][:count].tolist()
+            recv = record['bytes_recv'][:count].tolist()
+            counters = {name.decode('utf-8', 'replace'): InterfaceCounters(s, r)
+                        for name, s, r in zip(names, sent, recv)}
+            reads.append((float(record['timestamp']), counters))
+        return reads
+
+    def close(self):
+        self.metrics.close()
+        self.network.close()
+
+def battery_from_record(record):
+    """BatteryState stored in a metrics record, or None"""
+    percent = int(record['battery_percent'])
+    if percent < 0:
+        return None
+    secsleft = int(record['battery_secsleft'])
+    return BatteryState(percent, bool(record['battery_plugged']), secsleft)
+
+class Collector:
+    """Samples with a metrics backend and writes the readings into the rings
+
+    The collector also records the metric history, since it keeps sampling
+    while the widgets reading from it are hidden.
+    """
+
+    def __init__(self, name=DEFAULT_NAME, backend=None, history_dir=DEFAULT_DIR):
+        self.backend = backend or default_backend()
+        self.battery = BatteryModel(self.backend)
+        self.rates = NetworkRateEstimator()  # Upload and download averages for the history
+        self.metrics = SharedRing.create(f"{name}_metrics", METRICS_DTYPE, METRICS_CAPACITY)
+        try:
+            self.network = SharedRing.create(f"{name}_network", NETWORK_DTYPE, NETWORK_CAPACITY)
+        except Exception:
+            self.metrics.close()
+            raise
+
+        self.history = None
+        if history_dir:
+            try:
+                self.history = MetricHistory(history_dir)
+            except Exception as e:
+                print(f"Error opening metric history {history_dir}: {e}")
+
+    def sample_network(self):
+        try:
+            counters = self.backend.net_io_counters()
+        except Exception as e:
+            print(f"Error sampling network counters: {e}")
+            return
+        timestamp = time.monotonic()
+        self.rates.add(timestamp, counters)
+        items = list(counters.items())[:MAX_INTERFACES]
+
+        def fill(record):
+            record['timestamp'] = timestamp
+            record['count'] = len(items)
+            for i, (name, io) in enumerate(items):
+                record['names'][i] = name.encode('utf-8')[:INTERFACE_NAME_BYTES]
+                record['bytes_sent'][i] = io.bytes_sent
+                record['bytes_recv'][i] = io.bytes_recv
+        self.network.write(fill)
+
+    def sample_metrics(self):
+        try:
+            timestamp = time.monotonic()
+            cpu_percent = self.backend.cpu_percent()
+            cpu_per_core = self.backend.cpu_percent_per_core()[:MAX_CORES]
+            memory_percent = self.backend.memory_percent()
+        except Exception as e:
+            print(f"Error sampling metrics: {e}")
+            return
+        battery = self.battery.state
+
+        def fill(record):
+            record['timestamp'] = timestamp
+            record['cpu_percent'] = cpu_percent
+            record['cpu_count'] = len(cpu_per_core)
+            record['cpu_per_core'][:len(cpu_per_core)] = cpu_per_core
+            record['memory_percent'] = memory_percent
+            record['battery_percent'] = battery.percent if battery else -1
+            record['battery_plugged'] = bool(battery and battery.power_plugged)
+            secsleft = battery.secsleft if battery else -1
+            record['battery_secsleft'] = secsleft if isinstance(secsleft, int) and secsleft >= 0 else -1
+        self.metrics.write(fill)
+
+        rates = self.rates.take_bucket()
+        if self.history is not None:
+            try:
+                self.history.append(
+                    time.time() - (time.monotonic() - timestamp),
+                    cpu_percent=cpu_percent,
+                    memory_percent=memory_percent,
+                    upload=rates.upload_avg,
+                    download=rates.download_avg,
+                    battery_percent=battery.percent if battery else float('nan'),
+                )
+            except Exception as e:
+                print(f"Error writing metric history: {e}")
+
+    def idle_for(self):
+        """Seconds since any reader last read the rings"""
+        return time.monotonic() - float(self.metrics.header['reader_heartbeat'])
+
+    def run(self, exit_when_idle=None):
+        """Sample until interrupted, or until no reader has read for exit_when_idle seconds"""
+        now = time.monotonic()
+        next_network = now
+        next_metrics = now
+        next_battery = now
+        try:
+            while True:
+                now = time.monotonic()
+                if now >= next_battery:
+                    self.battery.poll()
+                    next_battery = now + self.battery.interval() / 1000
+                if now >= next_network:
+                    self.sample_network()
+                    next_network += NETWORK_INTERVAL
+                    if next_network < now:
+                        next_network = now + NETWORK_INTERVAL  # Skip reads missed while stalled
+                if now >= next_metrics:
+                    self.sample_metrics()
+                    next_metrics += METRICS_INTERVAL
+                    if next_metrics < now:
+                        next_metrics = now + METRICS_INTERVAL
+                    if exit_when_idle is not None and self.idle_for() > exit_when_idle:
+                        break
+                time.sleep(max(0.0, min(next_network, next_metrics, next_battery) - time.monotonic()))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.close()
+
+    def close(self):
+        self.metrics.close()
+        self.network.close()
+        if self.history is not None:
+            self.history.close()
+
+def _unlink(name):
+    """Remove the rings of a collector that exited without cleaning up"""
+    for suffix in ('_metrics', '_network'):
+        try:
+            shm = shared_memory.SharedMemory(name=f"{name}{suffix}")
+        except FileNotFoundError:
+            continue
+        shm.close()
+        shm.unlink()
+
+def ensure_collector(name=DEFAULT_NAME, timeout=5.0, idle_exit=30, history_dir=DEFAULT_DIR):
+    """Attach to the named collector, starting one in the background if needed
+
+    A collector started here records the metric history in history_dir,
+    or none if history_dir is empty.
+    """
+    try:
+        reader = CollectorReader(name)
+        if not reader.stalled(STALE_AFTER):
+            return reader
+        reader.close()
+        _unlink(name)
+    except FileNotFoundError:
+        pass
+
+    command = [sys.executable, os.path.abspath(__file__), '--name', name, '--exit-when-idle', str(idle_exit),
+               '--history-dir', history_dir or '']
+    kwargs = {'stdin': subprocess.DEVNULL, 'stdout': subprocess.DEVNULL, 'stderr': subprocess.DEVNULL}
+    if os.name == 'nt':
+        kwargs['creationflags'] = subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+    else:
+        kwargs['start_new_session'] = True
+    subprocess.Popen(command, **kwargs)
+
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            return CollectorReader(name)
+        except (FileNotFoundError, ValueError):
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.05)
+
+def read_loop(name):
+    """Print every new snapshot from a running collector"""
+    reader = CollectorReader(name)
+    try:
+        while True:
+            for record in reader.read_metrics():
+                battery = battery_from_record(record)
+                battery_text = f"{battery.percent}%{' plugged' if battery.power_plugged else ''}" if battery else "n/a"
+                print(f"{record['timestamp']:12.3f}  cpu {record['cpu_percent']:5.1f}%  "
+                      f"mem {record['memory_percent']:5.1f}%  battery {battery_text}")
+            for timestamp, counters in reader.read_network()[-1:]:
+                sent = sum(io.bytes_sent for io in counters.values())
+                recv = sum(io.bytes_recv for io in counters.values())
+                print(f"{timestamp:12.3f}  net sent {sent / (1024 * 1024):.1f} MB  recv {recv / (1024 * 1024):.1f} MB")
+            time.sleep(METRICS_INTERVAL)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        reader.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Shared metrics collector for the desktop widgets")
+    parser.add_argument('--name', default=DEFAULT_NAME, help="shared memory name prefix")
+    parser.add_argument('--read', action='store_true', help="print samples from a running collector")
+    parser.add_argument('--exit-when-idle', type=float, metavar='SECONDS',
+                        help="exit once no reader has read for this long")
+    parser.add_argument('--history-dir', default=DEFAULT_DIR,
+                        help="directory of the on-disk metric history, empty to keep none")
+    args = parser.parse_args()
+
+    # Unlink the shared memory when terminated, not only on Ctrl+C
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+    if args.read:
+        read_loop(args.name)
+        return 0
+
+    try:
+        collector = Collector(args.name, history_dir=args.history_dir)
+    except FileExistsError:
+        print(f"A collector named {args.name} is already running")
+        return 1
+    collector.run(args.exit_when_idle)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
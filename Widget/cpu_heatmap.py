@@ -0,0 +1,93 @@
+from PyQt6.QtWidgets import QWidget
+from PyQt6.QtCore import QRectF
+from PyQt6.QtGui import QPainter, QColor, QImage
+from instrumentation import instrument_class
+import numpy as np
+
+# Pixels per sample column
+COLUMN_WIDTH = 4
+
+# Utilization percent -> color, interpolated between these stops
+_HEAT_STOPS = [
+    (0, (30, 40, 70, 140)),     # Idle, dark blue
+    (40, (40, 120, 180, 200)),  # Relaxed blue, as the CPU graph
+    (75, (230, 160, 40, 230)),  # Orange
+    (100, (230, 50, 50, 255)),  # Pegged, red
+]
+
+def _heat_colors():
+    """Premultiplied ARGB32 pixel for every whole percent from 0 to 100"""
+    percents = np.arange(101)
+    stops = [stop for stop, _ in _HEAT_STOPS]
+    r, g, b, a = (np.interp(percents, stops, [color[i] for _, color in _HEAT_STOPS]) for i in range(4))
+    alpha = a / 255
+    channels = [np.round(channel).astype(np.uint32) for channel in (a, r * alpha, g * alpha, b * alpha)]
+    return (channels[0] << 24) | (channels[1] << 16) | (channels[2] << 8) | channels[3]
+
+HEAT_COLORS = _heat_colors()
+
+@instrument_class
+class CpuHeatmap(QWidget):
+    """Per-core CPU utilization over time, one row per core and one column per sample
+
+    Colors are looked up for a whole column at once and stored into a NumPy
+    array that a QImage wraps without copying. The array is a ring of
+    columns, so a new sample overwrites a single column and painting draws
+    the ring in two pieces. With more cores than pixel rows, neighbouring
+    cores share a row showing the busiest of them, which keeps both the
+    image size and the paint time independent of the core count.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setFixedSize(280, 60)
+        self.cores = 0
+        self._pixels = None  # (rows, columns) uint32 ring of sample columns
+        self._image = None
+        self._groups = None  # First core of each row, when cores share rows
+        self._head = 0  # Column written next, which also holds the oldest sample
+
+    def _allocate(self, cores):
+        self.cores = cores
+        rows = max(1, min(cores, self.height()))
+        columns = max(1, self.width() // COLUMN_WIDTH)
+        self._pixels = np.zeros((rows, columns), dtype=np.uint32)
+        self._image = QImage(self._pixels.data, columns, rows, columns * 4,
+                             QImage.Format.Format_ARGB32_Premultiplied)
+        self._groups = (np.arange(rows) * cores) // rows if rows < cores else None
+        self._head = 0
+
+    def clear(self):
+        """Drop all columns, e.g. after a gap in the readings"""
+        self.cores = 0
+        self._pixels = None
+        self._image = None
+
+    def append(self, per_core):
+        """Add a column of per-core utilization percents"""
+        values = np.asarray(per_core, dtype=np.float32)
+        if not len(values):
+            return
+        if len(values) != self.cores:
+            self._allocate(len(values))
+        if self._groups is not None:
+            values = np.maximum.reduceat(values, self._groups)
+        percents = np.clip(np.nan_to_num(values), 0, 100).astype(np.intp)
+        self._pixels[:, self._head] = HEAT_COLORS[percents]
+        self._head = (self._head + 1) % self._pixels.shape[1]
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor(30, 30, 35, 100))
+        if self._image is None:
+            return
+
+        # Oldest columns from the head onwards go on the left
+        rows, columns = self._pixels.shape
+        scale = self.width() / columns
+        older = columns - self._head
+        painter.drawImage(QRectF(0, 0, older * scale, self.height()),
+                          self._image, QRectF(self._head, 0, older, rows))
+        if self._head:
+            painter.drawImage(QRectF(older * scale, 0, self._head * scale, self.height()),
+                              self._image, QRectF(0, 0, self._head, rows))
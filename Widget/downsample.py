@@ -0,0 +1,30 @@
+import numpy as np
+
+def _finite(x, y):
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    keep = np.isfinite(x) & np.isfinite(y)
+    return x[keep], y[keep]
+
+def min_max(x, y, buckets):
+    """Keep the lowest and highest point of each of `buckets` equal-width x ranges
+
+    x must be ascending. Returns at most 2 * buckets points in x order, so a
+    spike shorter than a bucket still reaches its full height.
+    """
+    x, y = _finite(x, y)
+    if len(x) <= 2 * buckets:
+        return x, y
+
+    span = x[-1] - x[0]
+    if span <= 0:
+        return x[[0, -1]], y[[0, -1]]
+    bins = np.minimum(((x - x[0]) * (buckets / span)).astype(np.int64), buckets - 1)
+
+    # Sorting by bin, then by value, puts each bin's minimum first and maximum last
+    by_value = np.lexsort((y, bins))
+    sorted_bins = bins[by_value]
+    first = np.flatnonzero(np.r_[True, sorted_bins[1:] != sorted_bins[:-1]])
+    last = np.r_[first[1:] - 1, len(by_value) - 1]
+    keep = np.unique(np.concatenate((by_value[first], by_value[last])))
+    return x[keep], y[keep]
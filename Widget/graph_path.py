@@ -0,0 +1,85 @@
+from PyQt6.QtCore import QPointF
+from PyQt6.QtGui import QPolygonF
+import numpy as np
+
+# Largest number of line pieces used to approximate one curve segment
+MAX_SUBDIVISIONS = 8
+
+def subdivisions_for(dx, dpr=1.0):
+    """Line pieces per segment so that each piece spans about two device pixels"""
+    return int(min(max(np.ceil(dx * dpr / 2), 1), MAX_SUBDIVISIONS))
+
+def curve_points(values, dx, height, start=0, offset=0.0, subdivisions=1):
+    """Compute the smoothed graph curve for values as an (n, 2) float64 array
+
+    Sample i is placed at x = (start + i) * dx + offset and y = height * (1 - value).
+    Consecutive samples are joined by cubic curves whose control points share
+    the segment's mid x, giving horizontal tangents at every sample. Each curve
+    is flattened into `subdivisions` straight pieces in one vectorized step.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    n = len(values)
+    xs = (np.arange(n, dtype=np.float64) + start) * dx + offset
+    ys = height * (1.0 - values)
+    if n < 2 or subdivisions <= 1:
+        return np.column_stack((xs, ys))
+
+    # Bernstein weights for t in (0, 1]; t = 0 is the previous segment's end point
+    t = np.arange(1, subdivisions + 1, dtype=np.float64) / subdivisions
+    u = 1.0 - t
+    b0, b1, b2, b3 = u ** 3, 3 * u * u * t, 3 * u * t * t, t ** 3
+
+    # Control points are (mid_x, y0) and (mid_x, y1)
+    x0, x1 = xs[:-1, None], xs[1:, None]
+    y0, y1 = ys[:-1, None], ys[1:, None]
+    mid_x = (x0 + x1) / 2
+    curve_x = x0 * b0 + mid_x * (b1 + b2) + x1 * b3
+    curve_y = y0 * (b0 + b1) + y1 * (b2 + b3)
+
+    points = np.empty(((n - 1) * subdivisions + 1, 2), dtype=np.float64)
+    points[0] = xs[0], ys[0]
+    points[1:, 0] = curve_x.ravel()
+    points[1:, 1] = curve_y.ravel()
+    return points
+
+def to_polygon(points):
+    """Copy an (n, 2) float64 array into a QPolygonF through its memory buffer"""
+    polygon = QPolygonF()
+    polygon.fill(QPointF(), len(points))
+    if len(points):
+        buffer = polygon.data()
+        buffer.setsize(points.size * points.itemsize)
+        np.frombuffer(buffer, dtype=np.float64).reshape(-1, 2)[:] = points
+    return polygon
+
+def column_envelope(xs, ys, width, dpr=1.0):
+    """Range of y covered by the curve in each device pixel column
+
+    xs must be ascending. Returns (x, top, bottom) for every column from the
+    first point to the last, with x at the column's left edge. Columns
+    without points are interpolated, and each column is stretched to meet
+    the previous one, so filling the columns draws a continuous line. With
+    several points per column this is far cheaper than stroking the zig-zag.
+    """
+    xs = np.asarray(xs, dtype=np.float64)
+    ys = np.asarray(ys, dtype=np.float64)
+    columns = np.clip(np.floor(xs * dpr).astype(np.int64), 0, max(int(round(width * dpr)) - 1, 0))
+    starts = np.flatnonzero(np.r_[True, columns[1:] != columns[:-1]])
+    used = columns[starts]
+    every = np.arange(used[0], used[-1] + 1)
+    top = np.interp(every, used, np.minimum.reduceat(ys, starts))
+    bottom = np.interp(every, used, np.maximum.reduceat(ys, starts))
+
+    # Bridge jumps between neighbouring columns
+    previous_top, previous_bottom = top[:-1].copy(), bottom[:-1].copy()
+    top[1:] = np.minimum(top[1:], previous_bottom)
+    bottom[1:] = np.maximum(bottom[1:], previous_top)
+    return every / dpr, top, bottom
+
+def fill_polygon(points, baseline):
+    """Curve points closed down to the baseline, for filling the area below"""
+    closed = np.empty((len(points) + 2, 2), dtype=np.float64)
+    closed[:-2] = points
+    closed[-2] = points[-1, 0], baseline
+    closed[-1] = points[0, 0], baseline
+    return to_polygon(closed)
@@ -0,0 +1,68 @@
+from PyQt6.QtCore import QObject, QUrl, pyqtSignal
+from PyQt6.QtNetwork import QNetworkAccessManager, QNetworkRequest, QNetworkReply
+from collections import deque
+
+class ImageFetcher(QObject):
+    """Asynchronous, cancellable image downloads on the Qt event loop
+
+    Requests are queued and at most max_concurrent run at once. One network
+    manager is shared, so connections to the same host are reused. Results are
+    delivered on the thread that owns the fetcher, normally the GUI thread.
+    """
+    finished = pyqtSignal(str, object)  # url, image bytes or None on failure
+
+    def __init__(self, max_concurrent=2, timeout_ms=10000):
+        super().__init__()
+        self.max_concurrent = max_concurrent
+        self._manager = QNetworkAccessManager(self)
+        self._manager.setTransferTimeout(timeout_ms)
+        self._queue = deque()
+        self._active = {}  # url -> QNetworkReply
+
+    def fetch(self, url):
+        """Queue a download unless one for url is already pending"""
+        if url in self._active or url in self._queue:
+            return
+        self._queue.append(url)
+        self._start_next()
+
+    def cancel(self, url):
+        """Drop a queued download or abort a running one; finished is not emitted"""
+        if url in self._queue:
+            self._queue.remove(url)
+        reply = self._active.pop(url, None)
+        if reply is not None:
+            reply.abort()
+        self._start_next()
+
+    def pending(self):
+        return list(self._active) + list(self._queue)
+
+    def _start_next(self):
+        while self._queue and len(self._active) < self.max_concurrent:
+            url = self._queue.popleft()
+            request = QNetworkRequest(QUrl(url))
+            request.setAttribute(
+                QNetworkRequest.Attribute.RedirectPolicyAttribute,
+                QNetworkRequest.RedirectPolicy.NoLessSafeRedirectPolicy
+            )
+            reply = self._manager.get(request)
+            reply.finished.connect(lambda url=url, reply=reply: self._on_finished(url, reply))
+            self._active[url] = reply
+
+    def _on_finished(self, url, reply):
+        reply.deleteLater()
+
+        # Aborted by cancel(), which already forgot about this reply
+        if self._active.get(url) is not reply:
+            return
+        del self._active[url]
+
+        data = None
+        if reply.error() == QNetworkReply.NetworkError.NoError:
+            data = bytes(reply.readAll())
+        else:
+            print(f"Error downloading image: {reply.errorString()}")
+
+        self.finished.emit(url, data or None)
+        self._start_next()
@@ -0,0 +1,141 @@
+import functools
+import json
+import math
+import time
+
+# Wrapped methods only check this flag while profiling is off
+_enabled = False
+
+def enable(enabled=True):
+    """Turn timing of paintEvent and update_data on or off"""
+    global _enabled
+    _enabled = enabled
+
+def is_enabled():
+    return _enabled
+
+class LatencyHistogram:
+    """Fixed-size latency histogram with quarter-octave buckets
+
+    Percentiles are reported as the upper edge of their bucket, which keeps
+    them within about 19% of the true value at constant memory.
+    """
+    BUCKETS_PER_OCTAVE = 4
+    BUCKETS = 40 * BUCKETS_PER_OCTAVE  # Covers 1 ns up to about 18 minutes
+
+    def __init__(self):
+        self.counts = [0] * self.BUCKETS
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+    def record(self, ns):
+        index = int(math.log2(ns) * self.BUCKETS_PER_OCTAVE) if ns > 1 else 0
+        self.counts[min(index, self.BUCKETS - 1)] += 1
+        self.count += 1
+        self.total_ns += ns
+        if ns > self.max_ns:
+            self.max_ns = ns
+
+    def percentile(self, p):
+        """Latency in ns below which p percent of the samples fall"""
+        if not self.count:
+            return 0
+        target = self.count * p / 100
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return min(2 ** ((index + 1) / self.BUCKETS_PER_OCTAVE), self.max_ns)
+        return self.max_ns
+
+    def summary(self):
+        """Count and latencies in milliseconds"""
+        return {
+            'count': self.count,
+            'mean_ms': round(self.total_ns / self.count / 1e6, 4) if self.count else 0,
+            'p50_ms': round(self.percentile(50) / 1e6, 4),
+            'p99_ms': round(self.percentile(99) / 1e6, 4),
+            'max_ms': round(self.max_ns / 1e6, 4),
+        }
+
+class Profiler:
+    """Latency histograms per widget instance and method"""
+
+    def __init__(self):
+        self.histograms = {}  # "Widget[name].method" -> LatencyHistogram
+        self.instances = {}  # Class name -> number of unnamed instances labelled so far
+        self.started = time.time()
+
+    def label(self, widget):
+        """Class name plus objectName, or plus a per-class number for unnamed widgets"""
+        label = getattr(widget, '_profiling_label', None)
+        if label is None:
+            cls = type(widget).__name__
+            name = widget.objectName()
+            if not name:
+                number = self.instances[cls] = self.instances.get(cls, 0) + 1
+                name = f"#{number}"
+            label = widget._profiling_label = f"{cls}[{name}]"
+        return label
+
+    def record(self, widget_name, method, ns):
+        key = f"{widget_name}.{method}"
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = LatencyHistogram()
+        histogram.record(ns)
+
+    def summary(self):
+        return {key: histogram.summary() for key, histogram in sorted(self.histograms.items())}
+
+    def worst(self, n=5, metric='p99_ms'):
+        """The n entries with the highest value of metric"""
+        entries = self.summary().items()
+        return sorted(entries, key=lambda item: item[1][metric], reverse=True)[:n]
+
+    def export_json(self, path):
+        """Write every histogram summary to path"""
+        report = {
+            'started': self.started,
+            'exported': time.time(),
+            'entries': self.summary(),
+        }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        return path
+
+    def reset(self):
+        self.histograms.clear()
+        self.started = time.time()
+
+# Application-wide profiler fed by every instrumented method
+profiler = Profiler()
+
+def instrument_method(func, method_name):
+    """Wrap func so each outermost call per widget is timed while profiling is on"""
+    flag = f"_profiling_{method_name}"
+
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        # Calls nested through super() are part of the outer measurement
+        if not _enabled or getattr(self, flag, False):
+            return func(self, *args, **kwargs)
+        setattr(self, flag, True)
+        start = time.perf_counter_ns()
+        try:
+            return func(self, *args, **kwargs)
+        finally:
+            profiler.record(profiler.label(self), method_name, time.perf_counter_ns() - start)
+            setattr(self, flag, False)
+
+    wrapper._instrumented = True
+    return wrapper
+
+def instrument_class(cls, methods=('paintEvent', 'update_data')):
+    """Instrument the given methods defined directly on cls"""
+    for name in methods:
+        func = cls.__dict__.get(name)
+        if func is not None and not getattr(func, '_instrumented', False):
+            setattr(cls, name, instrument_method(func, name))
+    return cls
@@ -0,0 +1,288 @@
+"""Persistent metric history in memory-mapped segment files
+
+Samples are kept at three resolutions: the raw 1 s samples and 10 s and
+1 min rollups holding the min, max and average of each bucket. Each
+resolution is split into segment files covering a fixed span of wall-clock
+time. A record's slot within its segment follows from its timestamp, so
+writes are in-place stores and reads are slices of the mapped file. Only
+the process holding the directory's lock file writes; any number of
+others can read:
+
+    python metric_history.py --last 3600   # print the last hour
+"""
+from numpy.lib.format import open_memmap
+import argparse
+import os
+import threading
+import time
+import numpy as np
+
+DEFAULT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.metric_history')
+
+LOCK_NAME = 'writer.lock'
+
+# Metrics stored in every record
+FIELDS = ['cpu_percent', 'memory_percent', 'upload', 'download', 'battery_percent']
+
+VALUES_DTYPE = np.dtype([(field, '<f4') for field in FIELDS])
+
+# Raw sample; timestamp is time.time(), 0 marks an empty slot
+SAMPLE_DTYPE = np.dtype([('timestamp', '<f8')] + [(field, '<f4') for field in FIELDS])
+
+# Rollup bucket; timestamp is the start of the bucket
+ROLLUP_DTYPE = np.dtype([
+    ('timestamp', '<f8'),
+    ('count', '<u4'),
+    ('min', VALUES_DTYPE),
+    ('max', VALUES_DTYPE),
+    ('avg', VALUES_DTYPE),
+])
+
+class Level:
+    """One resolution of the history and how its segment files are laid out"""
+
+    def __init__(self, name, resolution, segment_span, retention, rollup):
+        self.name = name
+        self.resolution = resolution  # Seconds per record
+        self.segment_span = segment_span  # Seconds per segment file
+        self.retention = retention  # Segment files kept on disk
+        self.rollup = rollup
+        self.dtype = ROLLUP_DTYPE if rollup else SAMPLE_DTYPE
+        self.slots = segment_span // resolution
+
+    def values(self, records, field, stat='avg'):
+        """Column of field from records; stat picks min, max or avg of rollups"""
+        return records[stat][field] if self.rollup else records[field]
+
+# Finest first; about 6 MB per day at 1 s, 3 MB per week at 10 s and 8 MB per two months at 1 min
+LEVELS = [
+    Level('1s', 1, 3600, 24, rollup=False),
+    Level('10s', 10, 86400, 7, rollup=True),
+    Level('1min', 60, 7 * 86400, 9, rollup=True),
+]
+
+def _try_lock(path):
+    """Open path and lock it exclusively without waiting; None if another process holds it"""
+    lock = open(path, 'a+b')
+    try:
+        if os.name == 'nt':
+            import msvcrt
+            lock.seek(0)
+            msvcrt.locking(lock.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(lock.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock.close()
+        return None
+    return lock
+
+class _Segment:
+    def __init__(self, path, level, start, writable=True):
+        self.path = path
+        self.level = level
+        self.start = start
+        self.data = None
+        if os.path.exists(path):
+            try:
+                data = open_memmap(path, mode='r+' if writable else 'r')
+                if data.dtype == level.dtype and data.shape == (level.slots,):
+                    self.data = data
+            except Exception as e:
+                print(f"Error opening history segment {path}: {e}")
+        if self.data is None:
+            if not writable:
+                raise ValueError(f"{path} is not a readable history segment")
+            # New or incompatible file; the file is sparse until slots are written
+            self.data = open_memmap(path, mode='w+', dtype=level.dtype, shape=(level.slots,))
+
+    def slot(self, timestamp):
+        return int((timestamp - self.start) // self.level.resolution)
+
+    def close(self):
+        if self.data.mode != 'r':
+            self.data.flush()
+        self.data = None
+
+class MetricHistory:
+    """Writes samples and their rollups to disk and reads time ranges back
+
+    Written from the sampler thread and read from the GUI thread; a lock
+    guards the set of open segments. Old segment files are deleted as new
+    ones are created, so disk use is bounded by each level's retention.
+
+    With writer=True the history tries to take the directory's lock file.
+    Without it, appends are ignored and segments are only mapped for the
+    duration of a query, so the writer can still rotate them.
+    """
+
+    def __init__(self, directory=DEFAULT_DIR, levels=LEVELS, writer=True):
+        self.directory = directory
+        self.levels = levels
+        self._segments = {}  # (level name, start) -> _Segment, kept open by the writer
+        self._lock = threading.Lock()
+        self._writer_lock = None  # Open lock file while this process is the writer
+        os.makedirs(directory, exist_ok=True)
+        if writer:
+            self.acquire_writer()
+
+    @property
+    def writable(self):
+        return self._writer_lock is not None
+
+    def acquire_writer(self):
+        """Become the directory's single writer if no other process is; returns writable"""
+        with self._lock:
+            if self._writer_lock is None:
+                self._writer_lock = _try_lock(os.path.join(self.directory, LOCK_NAME))
+        return self.writable
+
+    def level(self, name):
+        for level in self.levels:
+            if level.name == name:
+                return level
+        raise KeyError(name)
+
+    def append(self, timestamp, **values):
+        """Store one sample taken at time.time() timestamp and update the rollups
+
+        Missing fields are stored as NaN. Ignored unless this is the writer.
+        """
+        if not self.writable:
+            return
+        row = [float(values.get(field, np.nan)) for field in FIELDS]
+        with self._lock:
+            for level in self.levels:
+                segment = self._segment(level, timestamp, create=True)
+                record = segment.data[segment.slot(timestamp)]
+                if level.rollup:
+                    self._update_rollup(level, record, timestamp, row)
+                else:
+                    record['timestamp'] = timestamp
+                    for field, value in zip(FIELDS, row):
+                        record[field] = value
+
+    def _update_rollup(self, level, record, timestamp, row):
+        # The bucket lives in the mapped file, so a restart resumes it
+        start = timestamp - timestamp % level.resolution
+        if record['timestamp'] != start or record['count'] == 0:
+            record['timestamp'] = start
+            record['count'] = 0
+        count = int(record['count']) + 1
+        record['count'] = count
+        low, high, avg = record['min'], record['max'], record['avg']
+        for field, value in zip(FIELDS, row):
+            if count == 1:
+                low[field] = high[field] = avg[field] = value
+            else:
+                low[field] = min(low[field], value)
+                high[field] = max(high[field], value)
+                avg[field] += (value - avg[field]) / count
+
+    def query(self, level, start, end):
+        """Records of level with timestamps in [start, end), oldest first"""
+        if isinstance(level, str):
+            level = self.level(level)
+        parts = []
+        with self._lock:
+            segment_start = start - start % level.segment_span
+            while segment_start < end:
+                segment = self._segment(level, segment_start, create=False)
+                if segment is not None:
+                    first = max(0, segment.slot(start))
+                    last = min(level.slots, segment.slot(end) + 1)
+                    parts.append(np.array(segment.data[first:last]))
+                    if not self.writable:
+                        segment.close()
+                segment_start += level.segment_span
+        if not parts:
+            return np.zeros(0, dtype=level.dtype)
+        records = np.concatenate(parts)
+        timestamps = records['timestamp']
+        return records[(timestamps >= start) & (timestamps < end)]
+
+    def recent(self, seconds, max_points=720):
+        """Finest level showing the last seconds in at most max_points records
+
+        Returns (level, records).
+        """
+        now = time.time()
+        level = next((level for level in self.levels if seconds / level.resolution <= max_points),
+                     self.levels[-1])
+        return level, self.query(level, now - seconds, now + level.resolution)
+
+    def _segment(self, level, timestamp, create):
+        start = int(timestamp - timestamp % level.segment_span)
+        key = (level.name, start)
+        segment = self._segments.get(key)
+        if segment is not None:
+            return segment
+        path = os.path.join(self.directory, f"{level.name}-{start}.npy")
+        if not create and not os.path.exists(path):
+            return None
+        try:
+            segment = _Segment(path, level, start, self.writable)
+        except Exception as e:
+            print(f"Error opening history segment {path}: {e}")
+            return None
+        if not self.writable:
+            return segment
+        self._segments[key] = segment
+        if create:
+            self._rotate(level)
+        return segment
+
+    def _rotate(self, level):
+        """Delete the oldest segment files of level beyond its retention"""
+        prefix = f"{level.name}-"
+        starts = []
+        for filename in os.listdir(self.directory):
+            name, ext = os.path.splitext(filename)
+            if ext == '.npy' and name.startswith(prefix) and name[len(prefix):].isdigit():
+                starts.append(int(name[len(prefix):]))
+        starts.sort()
+        for start in starts[:-level.retention]:
+            # Mapped files cannot be deleted on Windows
+            segment = self._segments.pop((level.name, start), None)
+            if segment is not None:
+                segment.close()
+            try:
+                os.remove(os.path.join(self.directory, f"{prefix}{start}.npy"))
+            except OSError as e:
+                print(f"Error removing history segment: {e}")
+
+        # Keep only the segments still in use mapped
+        current = starts[-2:]
+        for key in [key for key in self._segments if key[0] == level.name and key[1] not in current]:
+            self._segments.pop(key).close()
+
+    def close(self):
+        with self._lock:
+            for segment in self._segments.values():
+                segment.close()
+            self._segments.clear()
+            if self._writer_lock is not None:
+                self._writer_lock.close()
+                self._writer_lock = None
+
+def monotonic_times(timestamps):
+    """Convert time.time() timestamps to the time.monotonic() clock used by the graphs"""
+    return np.asarray(timestamps, dtype=np.float64) - (time.time() - time.monotonic())
+
+def main():
+    parser = argparse.ArgumentParser(description="Print recorded metric history")
+    parser.add_argument('--dir', default=DEFAULT_DIR, help="history directory")
+    parser.add_argument('--last', type=float, default=3600, help="seconds of history to print")
+    args = parser.parse_args()
+
+    history = MetricHistory(args.dir, writer=False)
+    level, records = history.recent(args.last)
+    print(f"{len(records)} records at {level.name}")
+    for record in records:
+        stamp = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(record['timestamp']))
+        print(f"{stamp}  " + "  ".join(
+            f"{field} {level.values(record, field):.1f}" for field in FIELDS))
+    history.close()
+
+if __name__ == "__main__":
+    main()
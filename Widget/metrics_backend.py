@@ -0,0 +1,150 @@
+from collections import namedtuple
+import os
+import sys
+import psutil
+
+# Byte counters of one network interface, same fields as psutil's snetio
+InterfaceCounters = namedtuple('InterfaceCounters', ['bytes_sent', 'bytes_recv'])
+
+class PsutilBackend:
+    """Reads system metrics through psutil
+
+    Samplers only talk to a backend, so the source of the readings can be
+    swapped without touching the sampling and publishing code.
+    """
+
+    def cpu_percent(self):
+        """Total CPU utilization since the previous call"""
+        return psutil.cpu_percent()
+
+    def cpu_percent_per_core(self):
+        """List of per-core CPU utilization since the previous call"""
+        return psutil.cpu_percent(percpu=True)
+
+    def memory_percent(self):
+        return psutil.virtual_memory().percent
+
+    def net_io_counters(self):
+        """Interface name -> counters with bytes_sent and bytes_recv"""
+        return psutil.net_io_counters(pernic=True)
+
+    def sensors_battery(self):
+        """Object with percent, power_plugged and secsleft, or None without a battery"""
+        return psutil.sensors_battery()
+
+class ProcBackend(PsutilBackend):
+    """Reads CPU, memory and network counters straight from Linux /proc
+
+    psutil opens and fully parses /proc/stat, /proc/meminfo and /proc/net/dev
+    on every call. Here the files stay open and are re-read from offset 0
+    with os.pread, only as far as the needed lines go, and only the fields
+    the widgets use are parsed. cpu_percent_per_core() called right after
+    cpu_percent() reuses its read of /proc/stat. The battery is still read
+    through psutil.
+    """
+
+    def __init__(self):
+        fds = []
+        try:
+            for path in ('/proc/stat', '/proc/meminfo', '/proc/net/dev'):
+                fds.append(os.open(path, os.O_RDONLY))
+        except OSError:
+            for fd in fds:
+                os.close(fd)
+            raise
+        self._stat, self._meminfo, self._net_dev = fds
+
+        # The cpu lines come first in /proc/stat, before the long interrupt counts
+        self._stat_size = 512 + 160 * (os.cpu_count() or 1)
+        self._cpu_total = None  # (busy, total) jiffies at the previous call
+        self._cpu_per_core = None
+        self._core_lines = None  # Per-core lines of the read by cpu_percent(), not yet used
+        self._names = {}  # Interface names as read -> str
+
+    def _cpu_lines(self):
+        """Lines of /proc/stat for all CPUs and then each core"""
+        data = os.pread(self._stat, self._stat_size, 0)
+        lines = data[:data.rfind(b'\n')].split(b'\n')
+        count = 0
+        while count < len(lines) and lines[count].startswith(b'cpu'):
+            count += 1
+        return lines[:count]
+
+    @staticmethod
+    def _busy_total(line):
+        # user nice system idle iowait irq softirq steal; guest time is already in user and nice
+        values = [int(field) for field in line.split()[1:9]]
+        total = sum(values)
+        return total - values[3] - values[4], total
+
+    @staticmethod
+    def _percent(previous, current):
+        """Busy share between two (busy, total) readings, rounded like psutil"""
+        busy = current[0] - previous[0]
+        total = current[1] - previous[1]
+        if total <= 0:
+            return 0.0
+        return round(min(max(busy / total * 100, 0.0), 100.0), 1)
+
+    def cpu_percent(self):
+        lines = self._cpu_lines()
+        self._core_lines = lines[1:]
+        current = self._busy_total(lines[0])
+        previous, self._cpu_total = self._cpu_total, current
+        return self._percent(previous, current) if previous else 0.0
+
+    def cpu_percent_per_core(self):
+        lines, self._core_lines = self._core_lines, None
+        if lines is None:
+            lines = self._cpu_lines()[1:]
+        current = [self._busy_total(line) for line in lines]
+        previous, self._cpu_per_core = self._cpu_per_core, current
+        if not previous or len(previous) != len(current):
+            return [0.0] * len(current)
+        return [self._percent(before, now) for before, now in zip(previous, current)]
+
+    def memory_percent(self):
+        # MemTotal and MemAvailable are among the first lines
+        total = available = None
+        for line in os.pread(self._meminfo, 512, 0).split(b'\n'):
+            if line.startswith(b'MemTotal:'):
+                total = int(line.split()[1])
+            elif line.startswith(b'MemAvailable:'):
+                available = int(line.split()[1])
+                break
+        if not total or available is None:
+            return super().memory_percent()
+        return round((total - available) / total * 100, 1)
+
+    def net_io_counters(self):
+        chunks = []
+        offset = 0
+        while True:
+            chunk = os.pread(self._net_dev, 65536, offset)
+            chunks.append(chunk)
+            offset += len(chunk)
+            if len(chunk) < 65536:
+                break
+        data = b''.join(chunks) if len(chunks) > 1 else chunks[0]
+
+        counters = {}
+        # Two header lines, then "name: rx_bytes rx_packets ... tx_bytes ..."
+        for line in data.split(b'\n')[2:]:
+            name, sep, rest = line.partition(b':')
+            if not sep:
+                continue
+            fields = rest.split()
+            key = self._names.get(name)
+            if key is None:
+                key = self._names[name] = name.strip().decode('utf-8', 'replace')
+            counters[key] = InterfaceCounters(int(fields[8]), int(fields[0]))
+        return counters
+
+def default_backend():
+    """Backend used by the sampler and the collector: /proc on Linux, psutil elsewhere"""
+    if sys.platform.startswith('linux'):
+        try:
+            return ProcBackend()
+        except OSError as e:
+            print(f"Error opening /proc, reading metrics through psutil: {e}")
+    return PsutilBackend()
@@ -0,0 +1,406 @@
+from PyQt6.QtCore import Qt, QObject, QThread, QTimer, QMetaObject, pyqtSignal, pyqtSlot
+from PyQt6.QtWidgets import QApplication, QWidget
+from collections import namedtuple
+from network_rates import NetworkRateEstimator
+from battery_model import BatteryModel
+from metrics_backend import default_backend
+from collector import ensure_collector, battery_from_record, HEARTBEAT_INTERVAL
+from work_scheduler import WorkScheduler
+from metric_history import MetricHistory, DEFAULT_DIR
+import time
+
+# Immutable result of one sampling pass, shared by every subscribed widget
+MetricsSnapshot = namedtuple('MetricsSnapshot', [
+    'timestamp',       # time.monotonic() when the pass started
+    'cpu_percent',
+    'cpu_per_core',    # Tuple of per-core utilization percents, empty unless a widget wants them
+    'memory_percent',
+    'bytes_sent',      # Counter totals over all interfaces
+    'bytes_recv',
+    'battery',         # Cached BatteryState, or None
+    'network',         # NetworkRates for the interval since the previous snapshot
+])
+
+class _SamplerWorker(QObject):
+    """Runs on the sampler thread and collects all metrics in one pass
+
+    Network counters are read more often than snapshots are published and
+    aggregated by the rate estimator in between. The battery is polled on
+    its own adaptive schedule and only reported when it changes.
+    """
+    sampled = pyqtSignal(object)
+    battery_changed = pyqtSignal(object)
+
+    def __init__(self, interval, network_interval, history=None):
+        super().__init__()
+        self.interval = interval
+        self.network_interval = network_interval
+        self.history = history
+        self.per_core = False  # Set from the GUI thread while a widget shows per-core readings
+        self.backend = self.open_backend()
+        self.network = NetworkRateEstimator()
+        self.battery = BatteryModel(self.backend)
+
+        # Children of the worker, so they move to the worker thread with it.
+        # They are started and stopped through the WorkScheduler tasks below.
+        self.timer = QTimer(self)
+        self.timer.setInterval(interval)
+        self.timer.timeout.connect(self.sample)
+        self.network_timer = QTimer(self)
+        self.network_timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self.network_timer.setInterval(network_interval)
+        self.network_timer.timeout.connect(self.sample_network)
+        self.battery_timer = QTimer(self)
+        self.battery_timer.setSingleShot(True)
+        self.battery_timer.timeout.connect(self.sample_battery)
+
+        scheduler = WorkScheduler.instance()
+        self.task = scheduler.register(self.timer, name='metrics')
+        self.network_task = scheduler.register(self.network_timer, name='network')
+        # Not stretched on battery, so plugging in is noticed promptly
+        self.battery_task = scheduler.register(self.battery_timer, name='battery', battery_stretch=1.0)
+        # Tasks that run while a snapshot or battery subscriber is visible.
+        # Snapshots carry the battery, so they need its task too.
+        self.metrics_tasks = (self.task, self.network_task, self.battery_task)
+        self.battery_tasks = (self.battery_task,)
+
+    def open_backend(self):
+        return default_backend()
+
+    # Each kind of sampling starts with its first subscriber, so nothing is
+    # sampled for readings no widget shows
+    @pyqtSlot()
+    def start_metrics(self):
+        self.task.start()
+        self.network_task.start()
+        # Battery first, so the first snapshot already carries it
+        self.sample_battery(force=True)
+        self.sample()
+
+    @pyqtSlot()
+    def start_battery(self):
+        self.sample_battery(force=True)
+
+    @pyqtSlot()
+    def stop(self):
+        self.timer.stop()
+        self.network_timer.stop()
+        self.battery_timer.stop()
+
+    # Timer slots are decorated so they run on the worker thread; PyQt calls
+    # undecorated methods through a proxy living on the thread that connected them
+    @pyqtSlot()
+    def sample_battery(self, force=False):
+        if self.battery.poll() or force:
+            self.battery_changed.emit(self.battery.state)
+        self.battery_task.start(self.battery.interval())
+
+    @pyqtSlot()
+    def sample_network(self):
+        try:
+            counters = self.backend.net_io_counters()
+        except Exception as e:
+            print(f"Error sampling network counters: {e}")
+            return
+        # Timestamp right after the read so it matches the counters
+        self.network.add(time.monotonic(), counters)
+
+    @pyqtSlot()
+    def sample(self):
+        try:
+            timestamp = time.monotonic()
+            # Close the network bucket at the time of this snapshot
+            self.sample_network()
+            snapshot = MetricsSnapshot(
+                timestamp=timestamp,
+                cpu_percent=self.backend.cpu_percent(),
+                cpu_per_core=tuple(self.backend.cpu_percent_per_core()) if self.per_core else (),
+                memory_percent=self.backend.memory_percent(),
+                bytes_sent=self.network.bytes_sent,
+                bytes_recv=self.network.bytes_recv,
+                battery=self.battery.state,
+                network=self.network.take_bucket(),
+            )
+        except Exception as e:
+            print(f"Error sampling metrics: {e}")
+            return
+        self.record(snapshot)
+        self.sampled.emit(snapshot)
+
+    def record(self, snapshot):
+        """Append snapshot to the on-disk history"""
+        if self.history is None:
+            return
+        battery = snapshot.battery
+        try:
+            # Snapshots carry monotonic time; history is kept in wall-clock time
+            self.history.append(
+                time.time() - (time.monotonic() - snapshot.timestamp),
+                cpu_percent=snapshot.cpu_percent,
+                memory_percent=snapshot.memory_percent,
+                upload=snapshot.network.upload_avg,
+                download=snapshot.network.download_avg,
+                battery_percent=battery.percent if battery else float('nan'),
+            )
+        except Exception as e:
+            print(f"Error writing metric history: {e}")
+
+class _CollectorWorker(_SamplerWorker):
+    """Reads the readings of a collector process instead of sampling itself
+
+    Network reads are fed to the rate estimator with the collector's own
+    timestamps, so rates stay exact however late this thread reads them.
+    If the collector stops writing, a new one is started, and if that fails
+    the worker falls back to sampling in-process.
+    """
+
+    def __init__(self, reader, interval, network_interval, history=None):
+        super().__init__(interval, network_interval, history)
+        self.reader = reader
+        self._battery_sent = False
+        # The battery arrives with each metrics record; its own task only runs
+        # after falling back to sampling in-process
+        self.battery_tasks = (self.task, self.battery_task)
+
+        # Not under the WorkScheduler, so the collector does not exit while the widgets are hidden
+        self.heartbeat_timer = QTimer(self)
+        self.heartbeat_timer.setInterval(int(HEARTBEAT_INTERVAL * 1000))
+        self.heartbeat_timer.timeout.connect(self.heartbeat)
+
+    @pyqtSlot()
+    def start_metrics(self):
+        if self.reader is None:
+            super().start_metrics()
+            return
+        self.heartbeat_timer.start()
+        self.task.start()
+        self.network_task.start()
+        self.sample()
+
+    @pyqtSlot()
+    def start_battery(self):
+        if self.reader is None:
+            super().start_battery()
+            return
+        self.heartbeat_timer.start()
+        self.task.start()
+        self.sample()
+
+    def open_backend(self):
+        # Readings come from the collector; a backend is only opened to sample in-process
+        return None
+
+    @pyqtSlot()
+    def stop(self):
+        super().stop()
+        self.heartbeat_timer.stop()
+
+    @pyqtSlot()
+    def heartbeat(self):
+        if self.reader is None:
+            return
+        try:
+            self.reader.heartbeat()
+        except Exception as e:
+            print(f"Error checking in with the collector: {e}")
+
+    def reconnect(self):
+        """Attach to a new collector, or sample in-process if none can be started"""
+        name = self.reader.name
+        self.reader.close()
+        self.reader = None
+        try:
+            history_dir = self.history.directory if self.history is not None else None
+            self.reader = ensure_collector(name, history_dir=history_dir)
+            print(f"Collector {name} stopped writing; attached to a new one")
+            return
+        except Exception as e:
+            print(f"Error restarting collector {name}, sampling in-process: {e}")
+        self.heartbeat_timer.stop()
+        if self.history is not None:
+            self.history.acquire_writer()
+        self.backend = self.battery.backend = default_backend()
+        self.sample_battery(force=True)
+
+    @pyqtSlot()
+    def sample_network(self):
+        if self.reader is None:
+            super().sample_network()
+            return
+        try:
+            reads = self.reader.read_network()
+        except Exception as e:
+            print(f"Error reading network counters from the collector: {e}")
+            return
+        for timestamp, counters in reads:
+            self.network.add(timestamp, counters)
+
+    @pyqtSlot()
+    def sample(self):
+        if self.reader is None:
+            super().sample()
+            return
+        try:
+            self.sample_network()
+            records = self.reader.read_metrics()
+            if not len(records):
+                if self.reader.stalled():
+                    self.reconnect()
+                return
+            record = records[-1]
+            if self.battery.update(battery_from_record(record)) or not self._battery_sent:
+                self._battery_sent = True
+                self.battery_changed.emit(self.battery.state)
+            snapshot = MetricsSnapshot(
+                timestamp=float(record['timestamp']),
+                cpu_percent=float(record['cpu_percent']),
+                cpu_per_core=tuple(record['cpu_per_core'][:record['cpu_count']].tolist()) if self.per_core else (),
+                memory_percent=float(record['memory_percent']),
+                bytes_sent=self.network.bytes_sent,
+                bytes_recv=self.network.bytes_recv,
+                battery=self.battery.state,
+                network=self.network.take_bucket(),
+            )
+        except Exception as e:
+            print(f"Error reading metrics from the collector: {e}")
+            return
+        self.record(snapshot)
+        self.sampled.emit(snapshot)
+
+class MetricsSampler(QObject):
+    """Shared background sampler publishing snapshots to subscribed widgets"""
+    snapshot_ready = pyqtSignal(object)
+    battery_changed = pyqtSignal(object)
+
+    _instance = None
+
+    # Name of a collector process to read from instead of sampling in-process
+    collector_name = None
+
+    # Directory of the on-disk metric history, or None to keep no history.
+    # It is written by the collector when there is one, otherwise by the
+    # first sampler to take its lock; the others only read it.
+    history_dir = DEFAULT_DIR
+
+    @classmethod
+    def instance(cls):
+        """Return the application-wide sampler, creating it on first use"""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def __init__(self, interval=1000, network_interval=250):
+        super().__init__()
+        self.latest = None
+        self.battery = None
+        self._battery_known = False  # Set by the first battery reading
+        self._per_core_widgets = set()
+
+        self.history = None
+        if self.history_dir:
+            try:
+                self.history = MetricHistory(self.history_dir, writer=not self.collector_name)
+            except Exception as e:
+                print(f"Error opening metric history {self.history_dir}: {e}")
+
+        # Worker lives on its own thread so slow psutil calls never block painting
+        self._thread = QThread()
+        self._worker = self._create_worker(interval, network_interval)
+        self._worker.moveToThread(self._thread)
+        self._started = set()  # Names of the worker's start methods already called
+
+        # Cross-thread connection, delivered as a queued call on the GUI thread
+        self._worker.sampled.connect(self._publish)
+        self._worker.battery_changed.connect(self._publish_battery)
+
+        app = QApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self.shutdown)
+
+    def _create_worker(self, interval, network_interval):
+        if self.collector_name:
+            try:
+                reader = ensure_collector(self.collector_name, history_dir=self.history_dir)
+                return _CollectorWorker(reader, interval, network_interval, self.history)
+            except Exception as e:
+                print(f"Error attaching to collector {self.collector_name}, sampling in-process: {e}")
+                if self.history is not None:
+                    self.history.acquire_writer()
+        return _SamplerWorker(interval, network_interval, self.history)
+
+    def subscribe(self, slot):
+        """Connect a slot to receive every new snapshot
+
+        Sampling pauses while none of the widgets owning subscribed slots is visible.
+        """
+        self.snapshot_ready.connect(slot)
+        if self.latest is not None:
+            latest = self.latest
+            QTimer.singleShot(0, lambda: slot(latest))
+        self._add_owner(slot, *self._worker.metrics_tasks)
+        self._start("start_metrics")
+
+    def subscribe_battery(self, slot):
+        """Connect a slot to receive the BatteryState, or None, whenever it changes"""
+        self.battery_changed.connect(slot)
+        if self._battery_known:
+            battery = self.battery
+            QTimer.singleShot(0, lambda: slot(battery))
+        self._add_owner(slot, *self._worker.battery_tasks)
+        self._start("start_battery")
+
+    def _start(self, method):
+        """Call the worker's start method on its thread the first time it is needed"""
+        if method in self._started:
+            return
+        self._started.add(method)
+        if not self._thread.isRunning():
+            self._thread.start()
+        QMetaObject.invokeMethod(self._worker, method, Qt.ConnectionType.QueuedConnection)
+
+    def want_per_core(self, widget, wanted):
+        """Include per-core CPU readings in snapshots while any widget wants them"""
+        if wanted and widget not in self._per_core_widgets:
+            self._per_core_widgets.add(widget)
+            widget.destroyed.connect(lambda *args, widget=widget: self.want_per_core(widget, False))
+        elif not wanted:
+            self._per_core_widgets.discard(widget)
+        self._worker.per_core = bool(self._per_core_widgets)
+
+    def _add_owner(self, slot, *tasks):
+        owner = getattr(slot, '__self__', None)
+        if isinstance(owner, QWidget):
+            for task in tasks:
+                WorkScheduler.instance().add_widget(task, owner)
+
+    def unsubscribe(self, slot):
+        for signal in (self.snapshot_ready, self.battery_changed):
+            try:
+                signal.disconnect(slot)
+            except TypeError:
+                pass
+
+    def _publish(self, snapshot):
+        self.latest = snapshot
+        self.snapshot_ready.emit(snapshot)
+
+    def _publish_battery(self, battery):
+        self.battery = battery
+        self._battery_known = True
+        WorkScheduler.instance().set_on_battery(bool(battery) and not battery.power_plugged)
+        self.battery_changed.emit(battery)
+
+    def shutdown(self):
+        """Stop the sampler thread"""
+        scheduler = WorkScheduler.instance()
+        for task in (self._worker.task, self._worker.network_task, self._worker.battery_task):
+            scheduler.unregister(task)
+        if self._thread.isRunning():
+            # Timers have to be stopped from the thread that owns them
+            QMetaObject.invokeMethod(self._worker, "stop", Qt.ConnectionType.BlockingQueuedConnection)
+            self._thread.quit()
+            self._thread.wait()
+        if isinstance(self._worker, _CollectorWorker) and self._worker.reader is not None:
+            self._worker.reader.close()
+        if self.history is not None:
+            self.history.close()
@@ -4,6 +4,7 @@ from PyQt6.QtGui import (
     QPainter, QColor, QPen, QImage, QPixmap, QFont, QIcon, QPainterPath,
     QLinearGradient, QRadialGradient, QFontMetrics
 )
+from PyQt6.QtCore import pyqtSignal
 from PyQt6.QtWidgets import QLabel, QHBoxLayout, QVBoxLayout, QPushButton, QSlider, QFrame, QWidget
 import psutil
 import win32gui
@@ -19,10 +20,16 @@ import win32con
 import win32ui
 import win32com.client
 from winsdk.windows.media.control import GlobalSystemMediaTransportControlsSessionManager
-import asyncio
 import threading
 import webbrowser
+import time
+from spotify_poller import SpotifyPoller
+from album_art_cache import AlbumArtCache
+from instrumentation import instrument_class
+from binding import Observable, bind_text
+from work_scheduler import WorkScheduler
 
+@instrument_class
 class AlbumArtLabel(QLabel):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -85,6 +92,7 @@ class AlbumArtLabel(QLabel):
         else:
             super().paintEvent(event)
 
+@instrument_class
 class ScrollingLabel(QLabel):
     def __init__(self, text="", parent=None):
         super().__init__(text, parent)
@@ -99,28 +107,38 @@ class ScrollingLabel(QLabel):
         self._text_width = 0
         self._should_scroll = False
         
+        # Both timers pause while the label cannot be seen
+        scheduler = WorkScheduler.instance()
+        self._animation_task = scheduler.register(self._animation_timer, self, 'marquee')
+        self._pause_task = scheduler.register(self._pause_timer, self, 'marquee pause')
+        
     def setText(self, text):
+        # Same text keeps scrolling from where it is
+        if text == self.text():
+            return
         super().setText(text)
         self._reset_scroll()
         
     def _reset_scroll(self):
         self._scroll_pos = 0
-        self._animation_timer.stop()
-        self._pause_timer.stop()
+        self._animation_task.stop()
+        self._pause_task.stop()
         metrics = QFontMetrics(self.font())
         self._text_width = metrics.horizontalAdvance(self.text())
         self._should_scroll = self._text_width > self.width()
         if self._should_scroll:
-            self._pause_timer.start(2000)
+            self._pause_task.start(2000)
             
     def _start_scroll(self):
         if self._should_scroll:
-            self._animation_timer.start()
+            self._animation_task.start()
             
     def _update_scroll(self):
         if not self._should_scroll:
             return
-        self._scroll_pos = (self._scroll_pos + 1) % (self._text_width + self.width())
+        # Keep the scroll speed when the scheduler stretches the interval
+        step = max(1, round(self._animation_timer.interval() / 50))
+        self._scroll_pos = (self._scroll_pos + step) % (self._text_width + self.width())
         self.update()
         
     def paintEvent(self, event):
@@ -173,6 +191,9 @@ class IconButton(QPushButton):
         """)
 
 class MusicWidget(BaseWidget):
+    # Emitted from the Spotify init thread once a client is available
+    spotify_ready = pyqtSignal(object)
+    
     def __init__(self):
         super().__init__(size=(500, 100))
         self.title_label.setText("Now Playing")
@@ -195,11 +216,13 @@ class MusicWidget(BaseWidget):
         
         # Track info
         self.track_name = ScrollingLabel()
+        self.track_name.setObjectName("track_name")
         self.track_name.setFixedHeight(24)
         self.track_name.setFont(QFont("Segoe UI", 10))
         right_layout.addWidget(self.track_name)
         
         self.artist_name = ScrollingLabel()
+        self.artist_name.setObjectName("artist_name")
         self.artist_name.setFixedHeight(20)
         self.artist_name.setFont(QFont("Segoe UI", 9))
         self.artist_name.setStyleSheet("color: rgba(180, 180, 180, 0.7);")
@@ -255,21 +278,43 @@ class MusicWidget(BaseWidget):
         content_layout.addWidget(right_container)
         self.layout.addLayout(content_layout)
         
+        # Track info shown in the labels and the play button
+        self.track_title = Observable()
+        self.artists = Observable()
+        self.playing = Observable()
+        bind_text(self.track_name, self.track_title)
+        bind_text(self.artist_name, self.artists)
+        bind_text(self.play_button, self.playing, lambda playing: "⏸" if playing else "▶")
+        
         # Connect signals
         self.prev_button.clicked.connect(self.previous_track)
         self.play_button.clicked.connect(self.toggle_playback)
         self.next_button.clicked.connect(self.next_track)
-        self.progress_slider.sliderMoved.connect(self.seek)
+        # Seek once the drag ends rather than for every step of it
+        self.progress_slider.sliderReleased.connect(lambda: self.seek(self.progress_slider.value()))
+        
+        # Playback state is polled in the background
+        self.poller = SpotifyPoller()
+        self.poller.playback_changed.connect(self.update_data)
+        self.spotify_ready.connect(self.poller.set_client)
+        
+        # Progress is interpolated locally between polls
+        self.progress_timer = QTimer()
+        self.progress_timer.timeout.connect(self.update_progress)
+        self.progress_timer.setInterval(500)
         
-        # Update timer
-        self.update_timer = QTimer()
-        self.update_timer.timeout.connect(self.update_data)
-        self.update_timer.start(1000)  # Update every second
+        # Neither polling nor progress updates run while the widget is hidden
+        scheduler = WorkScheduler.instance()
+        scheduler.add_widget(self.poller.task, self)
+        self.progress_task = scheduler.register(self.progress_timer, self, 'progress')
         
         # Initialize state
         self.is_playing = False
         self.current_track = None
-        self.album_art_cache = {}
+        self.album_art_cache = AlbumArtCache(pixmap_size=self.album_art.size())
+        self.album_art_url = None  # Art wanted for the current track
+        self.progress_ms = 0
+        self.progress_time = 0
         
         # Initial update
         self.update_data()
@@ -277,14 +322,8 @@ class MusicWidget(BaseWidget):
         # Override base widget background to be fully transparent
         self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)
         
-        # Initialize Spotify session and async loop
+        # Initialize Spotify session
         self.spotify = None
-        self.spotify_cache = {}
-        self.loop = asyncio.new_event_loop()
-        self.async_thread = None
-        
-        # Set up media controls and start async thread
-        self.setup_media_controls()
         
         # Initialize Spotify in a separate thread
         threading.Thread(target=self.init_spotify, daemon=True).start()
@@ -342,8 +381,12 @@ class MusicWidget(BaseWidget):
                     print("Please try restarting the widget and authenticating again.")
                     return
             
-            # Create the Spotify client
-            self.spotify = spotipy.Spotify(auth_manager=auth_manager)
+            # Create the Spotify client, reusing one HTTP session for every call
+            self.spotify = spotipy.Spotify(
+                auth_manager=auth_manager,
+                requests_session=requests.Session(),
+                requests_timeout=5
+            )
             
             # Test the connection
             try:
@@ -358,6 +401,9 @@ class MusicWidget(BaseWidget):
                     print(f"Response status: {e.response.status_code}")
                     print(f"Response text: {e.response.text}")
             
+            # Hand the client to the poller on the GUI thread
+            self.spotify_ready.emit(self.spotify)
+            
         except Exception as e:
             print(f"\nError initializing Spotify: {e}")
             print("\nPlease ensure:")
@@ -367,83 +413,86 @@ class MusicWidget(BaseWidget):
             print("4. You have Spotify Premium (required for some API features)")
             self.spotify = None
         
-    async def update_album_art(self, image_url):
-        """Asynchronously update album art"""
-        try:
-            if image_url in self.spotify_cache:
-                return
-                
-            response = requests.get(image_url)
-            if response.status_code == 200:
-                img_data = response.content
-                img = QImage()
-                if img.loadFromData(img_data):
-                    scaled = img.scaled(
-                        self.album_art.size(),
-                        Qt.AspectRatioMode.KeepAspectRatio,
-                        Qt.TransformationMode.SmoothTransformation
-                    )
-                    pixmap = QPixmap.fromImage(scaled)
-                    if not pixmap.isNull():
-                        self.spotify_cache[image_url] = pixmap
-                        self.album_art.setPixmap(pixmap)
-        except Exception as e:
-            print(f"Error updating album art: {e}")
+    def request_album_art(self, image_url):
+        """Load art for the current track, dropping downloads for earlier tracks"""
+        self.album_art_url = image_url
+        self.album_art_cache.cancel_all(keep=image_url)
+        self.album_art_cache.request(
+            image_url,
+            lambda pixmap, url=image_url: self.show_album_art(url, pixmap)
+        )
     
-    def setup_media_controls(self):
-        """Set up async event loop for media controls"""
-        self.async_thread = threading.Thread(target=self._run_async_loop, daemon=True)
-        self.async_thread.start()
+    def show_album_art(self, image_url, pixmap):
+        """Display art delivered by the cache if it still belongs to the current track"""
+        if image_url == self.album_art_url:
+            self.album_art.setPixmap(pixmap)
     
-    def _run_async_loop(self):
-        """Run the async event loop in a separate thread"""
-        asyncio.set_event_loop(self.loop)
-        self.loop.run_forever()
-    
-    def update_data(self):
-        """Update the widget with current playback information"""
+    def update_data(self, current_playback=None, replied_at=None):
+        """Update the widget with playback information from the poller"""
         try:
-            # Get current playback state
-            current_playback = self.spotify.current_playback() if self.spotify else None
-            
             if current_playback and current_playback['item']:
                 track = current_playback['item']
                 self.current_track = track
                 
                 # Update track and artist names
-                self.track_name.setText(track['name'])
-                self.artist_name.setText(", ".join([artist['name'] for artist in track['artists']]))
+                self.track_title.set(track['name'])
+                self.artists.set(", ".join([artist['name'] for artist in track['artists']]))
                 
                 # Update play/pause button
                 self.is_playing = current_playback['is_playing']
-                self.play_button.setText("⏸" if self.is_playing else "▶")
+                self.playing.set(self.is_playing)
                 
-                # Update progress slider
-                progress_ms = current_playback['progress_ms']
-                duration_ms = track['duration_ms']
-                if duration_ms > 0:
-                    progress_percent = (progress_ms / duration_ms) * 100
-                    self.progress_slider.setValue(int(progress_percent))
+                # Remember progress so the slider can advance between polls
+                self.progress_ms = current_playback['progress_ms'] or 0
+                self.progress_time = replied_at if replied_at is not None else time.monotonic()
+                self.update_progress()
+                if self.is_playing:
+                    self.progress_task.start()
+                else:
+                    self.progress_task.stop()
                 
                 # Update album art if needed
                 if track.get('album') and track['album'].get('images'):
                     image_url = track['album']['images'][0]['url']
-                    asyncio.run_coroutine_threadsafe(
-                        self.update_album_art(image_url),
-                        self.loop
-                    )
+                    if image_url != self.album_art_url:
+                        self.request_album_art(image_url)
             else:
                 # Clear display if no track is playing
-                self.track_name.setText("Not Playing")
-                self.artist_name.setText("")
+                self.track_title.set("Not Playing")
+                self.artists.set("")
                 self.album_art.clear()
-                self.play_button.setText("▶")
+                self.album_art_url = None
+                self.album_art_cache.cancel_all()
+                self.playing.set(False)
                 self.progress_slider.setValue(0)
+                self.progress_task.stop()
                 self.current_track = None
                 
         except Exception as e:
             print(f"Error updating music widget: {e}")
     
+    def current_progress_ms(self):
+        """Playback position extrapolated from the last poll"""
+        progress = self.progress_ms
+        if self.is_playing:
+            progress += (time.monotonic() - self.progress_time) * 1000
+        return progress
+    
+    def update_progress(self):
+        """Move the progress slider without contacting Spotify"""
+        if not self.current_track or self.progress_slider.isSliderDown():
+            return
+        duration_ms = self.current_track['duration_ms']
+        if duration_ms <= 0:
+            return
+        progress = self.current_progress_ms()
+        self.progress_slider.setValue(int(min(progress / duration_ms, 1.0) * 100))
+        
+        # The track has ended, so find out what plays next
+        if progress >= duration_ms:
+            self.progress_task.stop()
+            self.poller.refresh()
+    
     def paintEvent(self, event):
         # Override paintEvent to make background fully transparent
         pass
@@ -521,7 +570,7 @@ class MusicWidget(BaseWidget):
             # Send previous track media key (VK_MEDIA_PREV_TRACK = 0xB1)
             win32api.keybd_event(0xB1, 0, 0, 0)
             win32api.keybd_event(0xB1, 0, win32con.KEYEVENTF_KEYUP, 0)
-            QTimer.singleShot(100, self.update_data)
+            QTimer.singleShot(100, self.poller.refresh)
         except Exception as e:
             print(f"Error handling previous track: {e}")
 
@@ -531,7 +580,7 @@ class MusicWidget(BaseWidget):
             # Send next track media key (VK_MEDIA_NEXT_TRACK = 0xB0)
             win32api.keybd_event(0xB0, 0, 0, 0)
             win32api.keybd_event(0xB0, 0, win32con.KEYEVENTF_KEYUP, 0)
-            QTimer.singleShot(100, self.update_data)
+            QTimer.singleShot(100, self.poller.refresh)
         except Exception as e:
             print(f"Error handling next track: {e}")
 
@@ -542,7 +591,7 @@ class MusicWidget(BaseWidget):
             win32api.keybd_event(0xB3, 0, win32con.KEYEVENTF_KEYUP, 0)
             
             # Update button state after a short delay
-            QTimer.singleShot(100, self.update_data)
+            QTimer.singleShot(100, self.poller.refresh)
         except Exception as e:
             print(f"Error toggling play state: {e}")
     
@@ -557,117 +606,6 @@ class MusicWidget(BaseWidget):
         # Fade in new text after a short delay
         QTimer.singleShot(150, lambda: self.track_container.setWindowOpacity(1.0))
     
-    def get_spotify_album_art(self, artist, title):
-        """Get album art URL from Spotify API"""
-        if not self.spotify:
-            print("Spotify client not initialized")
-            return None
-            
-        cache_key = f"{artist} - {title}"
-        if cache_key in self.spotify_cache:
-            print(f"Using cached album art for {cache_key}")
-            return self.spotify_cache[cache_key]
-            
-        try:
-            print(f"Searching Spotify for: {artist} - {title}")
-            
-            # First try to get currently playing track
-            current = self.spotify.current_playback()
-            if current and current.get('item'):
-                track = current['item']
-                if track['name'].lower() == title.lower() and any(a['name'].lower() == artist.lower() for a in track['artists']):
-                    if track['album']['images']:
-                        image_url = track['album']['images'][0]['url']
-                        print(f"Found album art from current playback")
-                        self.spotify_cache[cache_key] = image_url
-                        return image_url
-            
-            # If not found in current playback, search for the track
-            query = f"track:{title} artist:{artist}"
-            results = self.spotify.search(q=query, type='track', limit=1)
-            
-            if results and results['tracks']['items']:
-                track = results['tracks']['items'][0]
-                # Verify the match
-                track_name = track['name'].lower()
-                track_artists = [a['name'].lower() for a in track['artists']]
-                
-                if (track_name == title.lower() or track_name in title.lower() or title.lower() in track_name) and \
-                   (artist.lower() in track_artists or any(a in artist.lower() for a in track_artists)):
-                    
-                    if track['album']['images']:
-                        image_url = track['album']['images'][0]['url']
-                        print(f"Found album art from search")
-                        self.spotify_cache[cache_key] = image_url
-                        return image_url
-                    else:
-                        print("Track found but no album art available")
-                else:
-                    print(f"Search result didn't match closely enough: {track_name} by {', '.join(track_artists)}")
-            else:
-                print("No search results found")
-                
-        except Exception as e:
-            print(f"Error getting Spotify album art: {e}")
-            if hasattr(e, 'response') and e.response:
-                print(f"Response status: {e.response.status_code}")
-                print(f"Response text: {e.response.text}")
-        return None
-        
-    def update_spotify_album_art(self, artist, title):
-        """Update album art using Spotify API"""
-        if not self.spotify:
-            return False
-            
-        try:
-            # First try to get currently playing track
-            current = self.spotify.current_playback()
-            if current and current.get('item'):
-                track = current['item']
-                if track['album']['images']:
-                    image_url = track['album']['images'][0]['url']
-                    response = requests.get(image_url)
-                    if response.status_code == 200:
-                        img_data = response.content
-                        img = QImage()
-                        if img.loadFromData(img_data):
-                            scaled = img.scaled(
-                                self.album_art.size(),
-                                Qt.AspectRatioMode.KeepAspectRatio,
-                                Qt.TransformationMode.SmoothTransformation
-                            )
-                            pixmap = QPixmap.fromImage(scaled)
-                            if not pixmap.isNull():
-                                self.album_art.setPixmap(pixmap)
-                                return True
-            
-            # If not found in current playback, search for the track
-            query = f"track:{title} artist:{artist}"
-            results = self.spotify.search(q=query, type='track', limit=1)
-            
-            if results and results['tracks']['items']:
-                track = results['tracks']['items'][0]
-                if track['album']['images']:
-                    image_url = track['album']['images'][0]['url']
-                    response = requests.get(image_url)
-                    if response.status_code == 200:
-                        img_data = response.content
-                        img = QImage()
-                        if img.loadFromData(img_data):
-                            scaled = img.scaled(
-                                self.album_art.size(),
-                                Qt.AspectRatioMode.KeepAspectRatio,
-                                Qt.TransformationMode.SmoothTransformation
-                            )
-                            pixmap = QPixmap.fromImage(scaled)
-                            if not pixmap.isNull():
-                                self.album_art.setPixmap(pixmap)
-                                return True
-        except Exception as e:
-            print(f"Error updating Spotify album art: {e}")
-        
-        return False
-
     def seek(self, position):
         """Handle progress slider movement"""
         try:
@@ -676,21 +614,12 @@ class MusicWidget(BaseWidget):
                 duration_ms = self.current_track['duration_ms']
                 target_position_ms = int((position / 100) * duration_ms)
                 
-                # Seek to position
-                self.spotify.seek_track(target_position_ms)
+                # Seek in the background; the poller refreshes playback afterwards
+                self.poller.seek(target_position_ms)
                 
                 # Update the UI immediately
+                self.progress_ms = target_position_ms
+                self.progress_time = time.monotonic()
                 self.progress_slider.setValue(position)
-                
-                # Force a data update after a short delay
-                QTimer.singleShot(100, self.update_data)
         except Exception as e:
             print(f"Error seeking track position: {e}")
-            # Revert slider position on error
-            if self.current_track:
-                current_playback = self.spotify.current_playback()
-                if current_playback:
-                    progress_ms = current_playback['progress_ms']
-                    duration_ms = self.current_track['duration_ms']
-                    progress_percent = (progress_ms / duration_ms) * 100
-                    self.progress_slider.setValue(int(progress_percent)) 
@@ -0,0 +1,125 @@
+from collections import namedtuple
+import math
+
+# Throughput of one interface in bytes per second
+InterfaceRate = namedtuple('InterfaceRate', ['upload', 'download'])
+
+# Network state published with each metrics snapshot, rates in bytes per second
+NetworkRates = namedtuple('NetworkRates', [
+    'upload',         # EWMA-smoothed total upload rate
+    'download',       # EWMA-smoothed total download rate
+    'upload_avg',     # Exact mean upload rate over the display interval
+    'download_avg',   # Exact mean download rate over the display interval
+    'interfaces',     # Interface name -> smoothed InterfaceRate
+    'samples',        # Counter reads aggregated into the display interval
+])
+
+class _InterfaceState:
+    """Last counters and smoothed rates of one interface"""
+    __slots__ = ('timestamp', 'sent', 'recv', 'upload', 'download', 'primed')
+
+    def __init__(self, timestamp, sent, recv):
+        self.timestamp = timestamp
+        self.sent = sent
+        self.recv = recv
+        self.upload = 0.0
+        self.download = 0.0
+        self.primed = False  # Set once the first rate has been measured
+
+class NetworkRateEstimator:
+    """Turns timestamped per-interface byte counters into rates
+
+    Each delta is divided by the measured time since that interface's previous
+    read, so a late timer tick spreads its bytes over the real interval rather
+    than showing up as a spike. Smoothing is an EWMA whose weight depends on
+    the interval, 1 - exp(-dt / time_constant), so the response time does not
+    change with the sampling rate. Reads between two display updates are
+    summed into a bucket that take_bucket() turns into an exact mean rate.
+    """
+
+    def __init__(self, time_constant=1.5):
+        self.time_constant = time_constant
+        self._interfaces = {}  # Interface name -> _InterfaceState
+        self.bytes_sent = 0  # Counter totals over all interfaces at the last read
+        self.bytes_recv = 0
+        self.last_timestamp = None
+
+        # Display bucket
+        self._bucket_start = None
+        self._bucket_sent = 0
+        self._bucket_recv = 0
+        self._bucket_samples = 0
+
+    def add(self, timestamp, counters):
+        """Feed one psutil.net_io_counters(pernic=True) result read at timestamp"""
+        total_sent = 0
+        total_recv = 0
+        interfaces = self._interfaces
+        for name, io in counters.items():
+            total_sent += io.bytes_sent
+            total_recv += io.bytes_recv
+            state = interfaces.get(name)
+            if state is None:
+                interfaces[name] = _InterfaceState(timestamp, io.bytes_sent, io.bytes_recv)
+                continue
+
+            dt = timestamp - state.timestamp
+            if dt <= 0:
+                continue
+            sent = io.bytes_sent - state.sent
+            recv = io.bytes_recv - state.recv
+            state.timestamp = timestamp
+            state.sent = io.bytes_sent
+            state.recv = io.bytes_recv
+            if sent < 0 or recv < 0:
+                # Counters wrapped or the interface was reset; start over from here
+                continue
+
+            if state.primed:
+                alpha = 1.0 - math.exp(-dt / self.time_constant)
+                state.upload += alpha * (sent / dt - state.upload)
+                state.download += alpha * (recv / dt - state.download)
+            else:
+                # Start from the first measured rate instead of ramping up from zero
+                state.upload = sent / dt
+                state.download = recv / dt
+                state.primed = True
+            self._bucket_sent += sent
+            self._bucket_recv += recv
+
+        # Forget interfaces that went away
+        if len(interfaces) != len(counters):
+            for name in [name for name in interfaces if name not in counters]:
+                del interfaces[name]
+
+        self.bytes_sent = total_sent
+        self.bytes_recv = total_recv
+        self.last_timestamp = timestamp
+        if self._bucket_start is None:
+            self._bucket_start = timestamp
+        self._bucket_samples += 1
+
+    def take_bucket(self):
+        """Rates for the reads since the previous call, then start a new bucket"""
+        elapsed = 0.0
+        if self._bucket_start is not None:
+            elapsed = self.last_timestamp - self._bucket_start
+        upload_avg = self._bucket_sent / elapsed if elapsed > 0 else 0.0
+        download_avg = self._bucket_recv / elapsed if elapsed > 0 else 0.0
+
+        interfaces = {name: InterfaceRate(state.upload, state.download)
+                      for name, state in self._interfaces.items()}
+        rates = NetworkRates(
+            upload=sum(rate.upload for rate in interfaces.values()),
+            download=sum(rate.download for rate in interfaces.values()),
+            upload_avg=upload_avg,
+            download_avg=download_avg,
+            interfaces=interfaces,
+            samples=self._bucket_samples,
+        )
+
+        self._bucket_start = self.last_timestamp
+        self._bucket_sent = 0
+        self._bucket_recv = 0
+        self._bucket_samples = 0
+        return rates
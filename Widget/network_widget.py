@@ -1,110 +1,42 @@
 from PyQt6.QtWidgets import QVBoxLayout, QHBoxLayout, QLabel, QWidget
-from PyQt6.QtCore import Qt, QTimer, QRectF, QPointF
-from PyQt6.QtGui import QPainter, QColor, QFont, QPen, QPainterPath, QLinearGradient
+from PyQt6.QtCore import Qt
+from PyQt6.QtGui import QColor
 from base_widget import BaseWidget
-import psutil
-from collections import deque
+from time_series import TimeSeries
+from sparkline import SparklineGraph
+from autoscale import AutoScale
+from metrics_sampler import MetricsSampler
+from binding import Observable, Binding, bind_text, bind_repaint
+from metric_history import monotonic_times
+import time
 
-class NetworkGraphWidget(QWidget):
-    def __init__(self, parent=None):
+class NetworkGraphWidget(SparklineGraph):
+    def __init__(self, parent=None, log_scale=False):
         super().__init__(parent)
         self.setFixedSize(280, 60)
-        self.upload_data = [0] * 50
-        self.download_data = [0] * 50
         
-    def paintEvent(self, event):
-        painter = QPainter(self)
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        # Rates in KB/s, scaled to the peak of the last minute
+        self.autoscale = AutoScale(span=60, minimum=10, log=log_scale, units=(1, 1024, 1024 * 1024))
+        self.tick_format = self.format_tick
+        # An hour of rates in KB/s; the live view shows the last minute
+        self.upload_data = TimeSeries(3600, fill=0)
+        self.download_data = TimeSeries(3600, fill=0)
         
-        # Draw background
-        painter.fillRect(self.rect(), QColor(30, 30, 35, 100))
-        
-        # Draw grid lines
-        painter.setPen(QPen(QColor(255, 255, 255, 15), 1, Qt.PenStyle.DotLine))
-        
-        # Horizontal grid lines
-        for i in range(1, 4):
-            y = int(self.height() * (i / 4))
-            painter.drawLine(0, y, self.width(), y)
-        
-        # Vertical grid lines
-        step = self.width() / 10
-        for i in range(1, 10):
-            x = int(step * i)
-            painter.drawLine(x, 0, x, self.height())
-        
-        # Draw upload graph with smooth curve
-        self.draw_graph(painter, self.upload_data, QColor(220, 70, 70, 180))  # Keep red for upload
-        
-        # Draw download graph with smooth curve
-        self.draw_graph(painter, self.download_data, QColor(40, 180, 120, 180))  # Relaxed green for download
+        self.add_series(self.upload_data, QColor(220, 70, 70, 180), 'upload', 1 / 1024)  # Keep red for upload
+        self.add_series(self.download_data, QColor(40, 180, 120, 180), 'download', 1 / 1024)  # Relaxed green for download
     
-    def draw_graph(self, painter, data, color):
-        if not data:
-            return
-        
-        # Calculate points
-        points = []
-        w = self.width()
-        h = self.height()
-        dx = w / (len(data) - 1)
-        
-        for i, value in enumerate(data):
-            x = i * dx
-            y = h * (1 - value)
-            points.append(QPointF(x, y))
-        
-        # Create smooth curve path
-        path = QPainterPath()
-        path.moveTo(points[0])
-        
-        # Use cubic bezier curves to create smooth lines
-        for i in range(1, len(points) - 2):
-            p1 = points[i]
-            p2 = points[i + 1]
-            
-            # Calculate control points
-            ctrl1 = QPointF((p1.x() + p2.x()) / 2, p1.y())
-            ctrl2 = QPointF((p1.x() + p2.x()) / 2, p2.y())
-            
-            path.cubicTo(ctrl1, ctrl2, p2)
-        
-        # Add last segment
-        if len(points) > 2:
-            path.lineTo(points[-1])
-        
-        # Draw line
-        pen = QPen(color, 1.5)
-        painter.setPen(pen)
-        painter.drawPath(path)
-        
-        # Create fill path
-        fill_path = QPainterPath(path)
-        fill_path.lineTo(w, h)
-        fill_path.lineTo(0, h)
-        fill_path.closeSubpath()
-        
-        # Create and apply gradient fill
-        gradient = QLinearGradient(0, 0, 0, h)
-        gradient.setColorAt(0, QColor(color.red(), color.green(), color.blue(), 40))
-        gradient.setColorAt(1, QColor(color.red(), color.green(), color.blue(), 10))
-        painter.fillPath(fill_path, gradient)
-        
-        # Add highlight effect on the line
-        highlight = QPen(QColor(color.red(), color.green(), color.blue(), 100), 3)
-        painter.setPen(highlight)
-        painter.drawPath(path)
+    def format_tick(self, kilobytes):
+        if kilobytes >= 1024 * 1024:
+            return f"{kilobytes / (1024 * 1024):g} GB/s"
+        if kilobytes >= 1024:
+            return f"{kilobytes / 1024:g} MB/s"
+        return f"{kilobytes:g} KB/s"
 
 class NetworkWidget(BaseWidget):
-    def __init__(self):
+    def __init__(self, log_scale=False):
         super().__init__(size=(300, 120))
         self.title_label.setText("Network")
         
-        # Initialize network counters
-        net = psutil.net_io_counters()
-        self.prev_bytes_sent = net.bytes_sent
-        self.prev_bytes_recv = net.bytes_recv
-        
         # Create main content layout
         content_layout = QVBoxLayout()
         content_layout.setContentsMargins(12, 8, 12, 12)
@@ -155,44 +87,44 @@ class NetworkWidget(BaseWidget):
         content_layout.addWidget(stats_container)
         
         # Network graph
-        self.graph = NetworkGraphWidget()
+        self.graph = NetworkGraphWidget(log_scale=log_scale)
         content_layout.addWidget(self.graph)
         
         self.layout.addLayout(content_layout)
         
-        # Update timer
-        self.update_timer = QTimer()
-        self.update_timer.timeout.connect(self.update_data)
-        self.update_timer.start(1000)  # Update every second
+        # Displayed values in bytes and bytes per second
+        self.upload_rate = Observable()
+        self.download_rate = Observable()
+        self.bytes_sent = Observable()
+        self.bytes_recv = Observable()
+        self.interfaces = Observable()
+        self.samples = Observable()
+        bind_text(self.upload_value, self.upload_rate, self.format_speed)
+        bind_text(self.download_value, self.download_rate, self.format_speed)
+        bind_text(self.upload_total, self.bytes_sent, self.format_total)
+        bind_text(self.download_total, self.bytes_recv, self.format_total)
+        Binding([self.interfaces], self.update_tooltip)
+        bind_repaint(self.graph, self.samples)
+        
+        # Start from the recorded history, then receive readings from the shared background sampler
+        self.load_history()
+        MetricsSampler.instance().subscribe(self.update_data)
+    
+    def load_history(self):
+        """Fill the graph with the rates recorded in the time span it shows"""
+        history = MetricsSampler.instance().history
+        if history is None:
+            return
+        self.graph.history = history
+        now = time.time()
+        records = history.query('1s', now - self.graph.upload_data.capacity, now)
+        if not len(records):
+            return
+        times = monotonic_times(records['timestamp'])
+        self.graph.upload_data.extend(records['upload'] / 1024, times)
+        self.graph.download_data.extend(records['download'] / 1024, times)
+        self.samples.set(self.graph.upload_data.total)
     
-    def update_data(self):
-        try:
-            # Get current network I/O stats
-            net_io = psutil.net_io_counters()
-            
-            # Calculate speeds
-            bytes_sent = net_io.bytes_sent - self.prev_bytes_sent
-            bytes_recv = net_io.bytes_recv - self.prev_bytes_recv
-            
-            # Update previous values
-            self.prev_bytes_sent = net_io.bytes_sent
-            self.prev_bytes_recv = net_io.bytes_recv
-            
-            # Update graph
-            self.graph.upload_data.append(bytes_sent / 1024)
-            self.graph.download_data.append(bytes_recv / 1024)
-            
-            # Format and update labels
-            self.upload_value.setText(f"{bytes_sent / 1024:.1f} KB/s")
-            self.download_value.setText(f"{bytes_recv / 1024:.1f} KB/s")
-            
-            # Format total transferred data
-            self.upload_total.setText(f"Total: {net_io.bytes_sent / (1024*1024):.1f} MB")
-            self.download_total.setText(f"Total: {net_io.bytes_recv / (1024*1024):.1f} MB")
-            
-        except Exception as e:
-            print(f"Error updating network data: {e}")
-
     def format_speed(self, bytes_per_sec):
         if bytes_per_sec >= 1024 * 1024:  # MB/s
             return f"{bytes_per_sec / (1024 * 1024):.1f} MB/s"
@@ -205,26 +137,27 @@ class NetworkWidget(BaseWidget):
         else:  # MB
             return f"Total: {bytes_total / (1024 * 1024):.1f} MB"
     
-    def update_data(self):
-        net_io = psutil.net_io_counters()
-        
-        # Calculate speeds
-        bytes_sent = net_io.bytes_sent
-        bytes_recv = net_io.bytes_recv
-        
-        upload_speed = bytes_sent - self.prev_bytes_sent
-        download_speed = bytes_recv - self.prev_bytes_recv
-        
-        # Update previous values
-        self.prev_bytes_sent = bytes_sent
-        self.prev_bytes_recv = bytes_recv
-        
-        # Update upload indicators
-        self.upload_value.setText(self.format_speed(upload_speed))
-        self.upload_total.setText(self.format_total(bytes_sent))
-        self.graph.upload_data.append(upload_speed / 1024)
-        
-        # Update download indicators
-        self.download_value.setText(self.format_speed(download_speed))
-        self.download_total.setText(self.format_total(bytes_recv))
-        self.graph.download_data.append(download_speed / 1024) 
\ No newline at end of file
+    def update_tooltip(self, interfaces):
+        # Per-interface breakdown on hover
+        self.setToolTip("\n".join(
+            f"{name}: \u2191 {self.format_speed(rate.upload)}  \u2193 {self.format_speed(rate.download)}"
+            for name, rate in sorted(interfaces.items())
+            if rate.upload >= 1 or rate.download >= 1
+        ))
+    
+    def update_data(self, snapshot):
+        network = snapshot.network
+
+        # Labels show the smoothed rate so they do not flicker between reads
+        self.upload_rate.set(network.upload)
+        self.download_rate.set(network.download)
+        self.bytes_sent.set(snapshot.bytes_sent)
+        self.bytes_recv.set(snapshot.bytes_recv)
+        self.interfaces.set(network.interfaces)
+
+        # Graph the exact mean rate over the interval since the previous snapshot
+        self.graph.upload_data.append(network.upload_avg / 1024, snapshot.timestamp)
+        self.graph.download_data.append(network.download_avg / 1024, snapshot.timestamp)
+
+        # Update graph
+        self.samples.set(self.graph.upload_data.total)
\ No newline at end of file
@@ -0,0 +1,74 @@
+from PyQt6.QtWidgets import QVBoxLayout, QHBoxLayout, QLabel, QPushButton
+from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtGui import QFont
+from base_widget import BaseWidget
+import instrumentation
+from work_scheduler import WorkScheduler
+import time
+
+class ProfilerOverlay(BaseWidget):
+    """Debug overlay listing the slowest paintEvent and update_data calls"""
+
+    def __init__(self, rows=6):
+        super().__init__(size=(480, 60 + rows * 16))
+        self.title_label.setText("Profiler")
+        self.rows = rows
+
+        # Profiling only records while enabled; the overlay implies it
+        instrumentation.enable()
+
+        content_layout = QVBoxLayout()
+        content_layout.setContentsMargins(12, 0, 12, 10)
+        content_layout.setSpacing(4)
+
+        self.table = QLabel()
+        self.table.setFont(QFont("Consolas", 8))
+        self.table.setStyleSheet("color: rgba(180, 180, 180, 0.9);")
+        self.table.setAlignment(Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignTop)
+        content_layout.addWidget(self.table, 1)
+
+        buttons_layout = QHBoxLayout()
+        buttons_layout.addStretch()
+        self.export_button = QPushButton("Export JSON")
+        self.export_button.setStyleSheet("""
+            QPushButton {
+                background-color: transparent;
+                border: 1px solid rgba(180, 180, 180, 0.3);
+                border-radius: 4px;
+                padding: 2px 8px;
+                color: rgba(180, 180, 180, 0.9);
+            }
+            QPushButton:hover {
+                background-color: rgba(255, 255, 255, 0.1);
+            }
+        """)
+        self.export_button.clicked.connect(self.export)
+        buttons_layout.addWidget(self.export_button)
+        content_layout.addLayout(buttons_layout)
+
+        self.layout.addLayout(content_layout)
+
+        # Refresh the table once a second
+        self.update_timer = QTimer(self)
+        self.update_timer.timeout.connect(self.update_data)
+        self.update_timer.setInterval(1000)
+        WorkScheduler.instance().register(self.update_timer, self, 'profiler').start()
+        self.update_data()
+
+    def update_data(self, snapshot=None):
+        lines = [f"{'widget[name].method':<44}{'n':>6}{'p50':>7}{'p99':>7}{'max':>7}"]
+        for key, stats in instrumentation.profiler.worst(self.rows):
+            lines.append(
+                f"{key[:43]:<44}{stats['count']:>6}"
+                f"{stats['p50_ms']:>7.2f}{stats['p99_ms']:>7.2f}{stats['max_ms']:>7.2f}"
+            )
+        self.table.setText("\n".join(lines))
+
+    def export(self):
+        """Write the current histograms to a timestamped JSON file"""
+        path = time.strftime("profile-%Y%m%d-%H%M%S.json")
+        try:
+            instrumentation.profiler.export_json(path)
+            print(f"Profile written to {path}")
+        except OSError as e:
+            print(f"Error exporting profile: {e}")
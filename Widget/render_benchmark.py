@@ -0,0 +1,346 @@
+"""Headless rendering benchmark for every widget and graph component
+
+Widgets are fed fake data (no psutil sampling, Spotify or win32 calls) and
+rendered offscreen into a QImage. Each device pixel ratio runs in its own
+process so Qt reports that ratio to the widgets themselves.
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import types
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'render_baseline.json')
+DPRS = (1.0, 1.5, 2.0)
+SIZE_SCALES = (1.0, 2.0)
+
+
+def install_fake_modules():
+    """Stand-ins for the Windows and Spotify modules music_widget imports"""
+    for name in ('win32gui', 'win32process', 'win32api', 'win32ui', 'win32com', 'win32com.client',
+                 'winsdk', 'winsdk.windows', 'winsdk.windows.media', 'winsdk.windows.media.control',
+                 'spotipy', 'spotipy.oauth2'):
+        sys.modules.setdefault(name, types.ModuleType(name))
+    sys.modules['win32con'] = sys.modules.get('win32con') or types.ModuleType('win32con')
+    sys.modules['win32con'].KEYEVENTF_KEYUP = 2
+    control = sys.modules['winsdk.windows.media.control']
+    control.GlobalSystemMediaTransportControlsSessionManager = object
+    sys.modules['spotipy'].Spotify = object
+    sys.modules['spotipy.oauth2'].SpotifyOAuth = object
+
+def install_fake_sampler():
+    """Replace the shared metrics sampler with one that never samples"""
+    from PyQt6.QtCore import QObject
+    from metrics_sampler import MetricsSampler
+
+    class FakeSampler(QObject):
+        history = None  # Graphs start empty instead of reading the real history
+
+        def subscribe(self, slot):
+            pass
+
+        def subscribe_battery(self, slot):
+            pass
+
+        def unsubscribe(self, slot):
+            pass
+
+    MetricsSampler._instance = FakeSampler()
+
+def fake_snapshot(i, rng, cores=8):
+    from metrics_sampler import MetricsSnapshot
+    from network_rates import NetworkRates, InterfaceRate
+    from battery_model import BatteryState
+    upload = rng.uniform(0, 100_000)
+    download = rng.uniform(0, 800_000)
+    network = NetworkRates(upload, download, upload, download,
+                           {'eth0': InterfaceRate(upload, download)}, samples=4)
+    return MetricsSnapshot(
+        timestamp=float(i),
+        cpu_percent=rng.uniform(0, 100),
+        cpu_per_core=tuple(rng.uniform(0, 100) for _ in range(cores)),
+        memory_percent=rng.uniform(30, 80),
+        bytes_sent=i * 50_000 + rng.randrange(50_000),
+        bytes_recv=i * 400_000 + rng.randrange(400_000),
+        # Drains by a percent every 50 samples, like a real battery does relative to repaints
+        battery=BatteryState(percent=100 - i // 50 % 100, power_plugged=bool(i // 1000 % 2), secsleft=3600),
+        network=network,
+    )
+
+def fake_playback(i):
+    duration_ms = 180_000
+    return {
+        'is_playing': True,
+        'progress_ms': (i * 1000) % duration_ms,
+        'item': {
+            'name': "A rather long track title that has to scroll",
+            'artists': [{'name': "Benchmark Artist"}],
+            'duration_ms': duration_ms,
+            'album': {},
+        },
+    }
+
+def fake_album_art():
+    from PyQt6.QtGui import QImage, QPainter, QLinearGradient, QColor, QPixmap
+    image = QImage(640, 640, QImage.Format.Format_ARGB32_Premultiplied)
+    painter = QPainter(image)
+    gradient = QLinearGradient(0, 0, 640, 640)
+    gradient.setColorAt(0, QColor(120, 90, 170))
+    gradient.setColorAt(1, QColor(40, 180, 120))
+    painter.fillRect(image.rect(), gradient)
+    painter.end()
+    return QPixmap.fromImage(image)
+
+def build_cases():
+    """name -> factory returning (widget, feed); feed(i) pushes sample i"""
+    rng = random.Random(0)
+
+    def system_monitor():
+        from system_monitor_widget import SystemMonitorWidget
+        widget = SystemMonitorWidget()
+        return widget, lambda i: widget.update_data(fake_snapshot(i, rng))
+
+    def network():
+        from network_widget import NetworkWidget
+        widget = NetworkWidget()
+        return widget, lambda i: widget.update_data(fake_snapshot(i, rng))
+
+    def battery():
+        from battery_widget import BatteryWidget
+        widget = BatteryWidget()
+        return widget, lambda i: widget.update_data(fake_snapshot(i, rng).battery)
+
+    def music():
+        from music_widget import MusicWidget
+
+        class BenchMusicWidget(MusicWidget):
+            def init_spotify(self):
+                pass
+
+        widget = BenchMusicWidget()
+        widget.album_art.setPixmap(fake_album_art())
+        return widget, lambda i: widget.update_data(fake_playback(i), time.monotonic())
+
+    def graph():
+        from system_monitor_widget import GraphWidget
+        widget = GraphWidget()
+
+        def feed(i):
+            widget.cpu_data.append(rng.random(), float(i))
+            widget.memory_data.append(rng.uniform(0.3, 0.8), float(i))
+        return widget, feed
+
+    def network_graph():
+        from network_widget import NetworkGraphWidget
+        widget = NetworkGraphWidget()
+
+        def feed(i):
+            widget.upload_data.append(rng.random(), float(i))
+            widget.download_data.append(rng.random(), float(i))
+        return widget, feed
+
+    def graph_hour():
+        # A full hour of samples, zoomed out and downsampled
+        from system_monitor_widget import GraphWidget
+        widget = GraphWidget()
+        widget.set_zoom(1)
+        now = time.monotonic()
+        times = [now - 3600 + k for k in range(3600)]
+        widget.cpu_data.extend([rng.random() for _ in range(3600)], times)
+        widget.memory_data.extend([rng.uniform(0.3, 0.8) for _ in range(3600)], times)
+
+        def feed(i):
+            widget.cpu_data.append(rng.random(), time.monotonic())
+            widget.memory_data.append(rng.uniform(0.3, 0.8), time.monotonic())
+        return widget, feed
+
+    def cpu_heatmap(cores):
+        from cpu_heatmap import CpuHeatmap
+        widget = CpuHeatmap()
+        return widget, lambda i: widget.append(fake_snapshot(i, rng, cores).cpu_per_core)
+
+    def album_art():
+        from music_widget import AlbumArtLabel
+        widget = AlbumArtLabel()
+        widget.setPixmap(fake_album_art())
+        return widget, lambda i: None
+
+    def scrolling_label():
+        from music_widget import ScrollingLabel
+        widget = ScrollingLabel("A rather long track title that has to scroll across the label")
+        widget.setFixedSize(200, 24)
+        widget.setText(widget.text())
+        return widget, lambda i: widget._update_scroll()
+
+    return {
+        'system_monitor': system_monitor,
+        'network': network,
+        'battery': battery,
+        'music': music,
+        'graph': graph,
+        'network_graph': network_graph,
+        'graph_hour': graph_hour,
+        'cpu_heatmap': lambda: cpu_heatmap(8),
+        'cpu_heatmap_128': lambda: cpu_heatmap(128),
+        'album_art': album_art,
+        'scrolling_label': scrolling_label,
+    }
+
+def measure(widget, feed, scale, dpr, iterations, alloc_iterations):
+    from PyQt6.QtGui import QImage
+    from PyQt6.QtCore import Qt
+    from PyQt6.QtWidgets import QApplication
+    from binding import FrameScheduler
+    scheduler = FrameScheduler.instance()
+
+    base = widget.size()
+    widget.setFixedSize(round(base.width() * scale), round(base.height() * scale))
+    QApplication.processEvents()
+
+    image = QImage(round(widget.width() * dpr), round(widget.height() * dpr),
+                   QImage.Format.Format_ARGB32_Premultiplied)
+    image.setDevicePixelRatio(dpr)
+
+    def paint(i):
+        feed(i)
+        # Apply bound label changes now instead of on the next frame
+        scheduler.flush()
+        image.fill(Qt.GlobalColor.transparent)
+        start = time.perf_counter()
+        widget.render(image)
+        return time.perf_counter() - start
+
+    # Warm up caches so steady-state painting is measured
+    for i in range(5):
+        paint(i)
+
+    elapsed = sum(paint(i) for i in range(5, 5 + iterations))
+
+    # Python heap allocated while painting, traced separately as tracing is slow
+    tracemalloc.start()
+    peak_total = 0
+    blocks_before = sys.getallocatedblocks()
+    for i in range(5 + iterations, 5 + iterations + alloc_iterations):
+        feed(i)
+        scheduler.flush()
+        tracemalloc.reset_peak()
+        current = tracemalloc.get_traced_memory()[0]
+        widget.render(image)
+        peak_total += tracemalloc.get_traced_memory()[1] - current
+    blocks_after = sys.getallocatedblocks()
+    tracemalloc.stop()
+
+    widget.setFixedSize(base)
+    return {
+        'paints_per_sec': round(iterations / elapsed, 1),
+        'ms_per_paint': round(elapsed / iterations * 1000, 4),
+        'peak_alloc_bytes_per_paint': round(peak_total / alloc_iterations),
+        'net_blocks_per_paint': round((blocks_after - blocks_before) / alloc_iterations, 2),
+    }
+
+def run_worker(dpr, names, iterations, alloc_iterations, output):
+    """Benchmark every case in this process at one device pixel ratio"""
+    install_fake_modules()
+    from PyQt6.QtWidgets import QApplication
+    app = QApplication(sys.argv)
+    install_fake_sampler()
+
+    results = {}
+    cases = build_cases()
+    for name in names:
+        widget, feed = cases[name]()
+        widget.show()
+        for scale in SIZE_SCALES:
+            key = f"{name}@{scale:g}x/dpr{dpr:g}"
+            results[key] = measure(widget, feed, scale, dpr, iterations, alloc_iterations)
+        widget.close()
+        app.processEvents()
+
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f)
+
+def run_all(names, iterations, alloc_iterations):
+    results = {}
+    for dpr in DPRS:
+        env = dict(os.environ, QT_QPA_PLATFORM='offscreen', QT_SCALE_FACTOR=f"{dpr:g}")
+        with tempfile.TemporaryDirectory() as tmp:
+            output = os.path.join(tmp, 'results.json')
+            command = [sys.executable, os.path.abspath(__file__), '--worker', '--dpr', f"{dpr:g}",
+                       '--iterations', str(iterations), '--alloc-iterations', str(alloc_iterations),
+                       '--output', output, '--cases', *names]
+            subprocess.run(command, env=env, cwd=tmp, check=True, stdout=subprocess.DEVNULL)
+            with open(output, 'r', encoding='utf-8') as f:
+                results.update(json.load(f))
+    return results
+
+def compare(results, baseline, tolerance):
+    """Descriptions of every result that regressed past the baseline"""
+    regressions = []
+    for key, base in baseline.items():
+        current = results.get(key)
+        if current is None:
+            continue
+        if current['paints_per_sec'] < base['paints_per_sec'] * (1 - tolerance):
+            regressions.append(f"{key}: {current['paints_per_sec']} paints/s, baseline {base['paints_per_sec']}")
+        # Small absolute slack so tiny allocation counts do not flap
+        limit = base['peak_alloc_bytes_per_paint'] * (1 + tolerance) + 1024
+        if current['peak_alloc_bytes_per_paint'] > limit:
+            regressions.append(
+                f"{key}: {current['peak_alloc_bytes_per_paint']} bytes/paint, "
+                f"baseline {base['peak_alloc_bytes_per_paint']}"
+            )
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless widget rendering benchmark")
+    parser.add_argument('--cases', nargs='+', default=list(build_cases()), help="cases to run")
+    parser.add_argument('--iterations', type=int, default=200, help="timed paints per measurement")
+    parser.add_argument('--alloc-iterations', type=int, default=20, help="traced paints per measurement")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="baseline results file")
+    parser.add_argument('--save-baseline', action='store_true', help="store these results as the baseline")
+    parser.add_argument('--check', action='store_true', help="exit with 1 on regressions against the baseline")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="allowed relative regression")
+    parser.add_argument('--output', help="write results to this JSON file")
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--dpr', type=float, default=1.0, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+        run_worker(args.dpr, args.cases, args.iterations, args.alloc_iterations, args.output)
+        return 0
+
+    results = run_all(args.cases, args.iterations, args.alloc_iterations)
+    for key, stats in results.items():
+        print(f"{key:<36}{stats['paints_per_sec']:>10.1f} paints/s"
+              f"{stats['peak_alloc_bytes_per_paint']:>10} B/paint")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+
+    if args.check:
+        if not os.path.exists(args.baseline):
+            # Paint rates are machine-specific, so no baseline ships with the repo
+            print(f"No baseline at {args.baseline}; skipping the check, run with --save-baseline to record one")
+            return 0
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
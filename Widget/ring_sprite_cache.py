@@ -0,0 +1,106 @@
+from PyQt6.QtCore import Qt, QRectF, QPointF
+from PyQt6.QtGui import QPainter, QColor, QPen, QPainterPath, QPixmap
+from collections import OrderedDict
+import math
+
+# Ring colors per state
+RING_COLORS = {
+    'charging': QColor("#063D08"),
+    'low': QColor(255, 50, 50, 200),  # Red for low battery
+    'normal': QColor(200, 200, 200, 200),  # Gray for normal battery
+}
+RING_BACKGROUND = QColor(30, 30, 35, 200)
+RING_WIDTH = 15
+
+class RingSpriteCache:
+    """Bounded LRU of pre-rendered battery rings
+
+    A sprite holds the background disc, the level arc and, while charging,
+    the bolt, cropped to the ring's bounds. Sprites are keyed by integer
+    percent, color state, device pixel ratio and widget size, and rendered
+    the first time they are needed.
+    """
+
+    _instance = None
+
+    @classmethod
+    def instance(cls):
+        """Return the cache shared by all battery widgets"""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def __init__(self, max_sprites=32):
+        self.max_sprites = max_sprites
+        self._sprites = OrderedDict()  # key -> (origin QPointF, QPixmap), least recently used first
+
+    def sprite(self, percent, state, dpr, width, height):
+        """(origin, pixmap) to draw at origin in widget coordinates"""
+        key = (percent, state, dpr, width, height)
+        sprite = self._sprites.get(key)
+        if sprite is not None:
+            self._sprites.move_to_end(key)
+            return sprite
+
+        sprite = self._render(percent, state, dpr, width, height)
+        self._sprites[key] = sprite
+        while len(self._sprites) > self.max_sprites:
+            self._sprites.popitem(last=False)
+        return sprite
+
+    def clear(self):
+        self._sprites.clear()
+
+    def _render(self, percent, state, dpr, width, height):
+        center = QPointF(width / 2, height / 2)
+        outer_radius = min(width, height) / 2 - 30
+
+        # Crop to the ring plus half the pen, aligned to whole device pixels
+        # so the blit lands exactly where direct painting would
+        extent = outer_radius + RING_WIDTH / 2 + 1
+        left = math.floor((center.x() - extent) * dpr)
+        top = math.floor((center.y() - extent) * dpr)
+        right = math.ceil((center.x() + extent) * dpr)
+        bottom = math.ceil((center.y() + extent) * dpr)
+        origin = QPointF(left / dpr, top / dpr)
+
+        pixmap = QPixmap(right - left, bottom - top)
+        pixmap.setDevicePixelRatio(dpr)
+        pixmap.fill(Qt.GlobalColor.transparent)
+
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.translate(-origin)
+
+        # Draw background circle
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(RING_BACKGROUND)
+        painter.drawEllipse(center, outer_radius, outer_radius)
+
+        if percent > 0:
+            color = RING_COLORS[state]
+
+            # Draw the arc
+            painter.setPen(QPen(color, RING_WIDTH, Qt.PenStyle.SolidLine, Qt.PenCapStyle.RoundCap))
+            start_angle = 90 * 16
+            span_angle = -int(360 * (percent / 100) * 16)
+            painter.drawArc(QRectF(center.x() - outer_radius, center.y() - outer_radius,
+                                   outer_radius * 2, outer_radius * 2),
+                            start_angle, span_angle)
+
+            # Draw charging indicator above the percentage text
+            if state == 'charging':
+                painter.setPen(QPen(color, 2.5))
+                painter.setBrush(color)
+                bolt_size = outer_radius * 0.15
+                bolt_y_offset = 20
+                bolt_path = QPainterPath()
+                bolt_path.moveTo(center.x(), center.y() - bolt_size - bolt_y_offset)
+                bolt_path.lineTo(center.x() - bolt_size/2, center.y() - bolt_y_offset)
+                bolt_path.lineTo(center.x(), center.y() + bolt_size/3 - bolt_y_offset)
+                bolt_path.lineTo(center.x() + bolt_size/2, center.y() - bolt_y_offset)
+                bolt_path.lineTo(center.x(), center.y() - bolt_size - bolt_y_offset)
+                painter.drawPath(bolt_path)
+
+        painter.end()
+        return origin, pixmap
@@ -0,0 +1,385 @@
+from PyQt6.QtWidgets import QWidget
+from PyQt6.QtCore import Qt, QRectF
+from PyQt6.QtGui import QPainter, QColor, QPen, QLinearGradient, QPixmap, QFont
+from graph_path import curve_points, subdivisions_for, to_polygon, fill_polygon, column_envelope
+from downsample import min_max
+from instrumentation import instrument_class
+from collections import namedtuple
+import math
+import time
+import numpy as np
+
+# Time span a graph can show, in seconds
+ZoomLevel = namedtuple('ZoomLevel', ['name', 'span'])
+
+# The first level is drawn live from the newest samples, the others are downsampled
+ZOOM_LEVELS = [ZoomLevel('1 min', 60), ZoomLevel('1 h', 3600), ZoomLevel('1 day', 86400)]
+
+class SparklineLayer:
+    """Offscreen buffer holding the rendered curve of one TimeSeries
+
+    The buffer is scrolled left as samples arrive and only the newest
+    segments are drawn, so the cost per sample does not depend on how
+    many samples are visible.
+    """
+
+    def __init__(self, series, color, history_field=None, history_scale=1.0):
+        self.series = series
+        self.color = color
+        self.window = None  # Newest samples drawn live, all by default
+
+        # MetricHistory field and factor to series units, for spans longer than the series
+        self.history_field = history_field
+        self.history_scale = history_scale
+
+        # Flat caps so adjacent segments drawn separately meet without overlap
+        self.line_pen = QPen(color, 1.5)
+        self.line_pen.setCapStyle(Qt.PenCapStyle.FlatCap)
+        self.highlight_pen = QPen(QColor(color.red(), color.green(), color.blue(), 100), 3)
+        self.highlight_pen.setCapStyle(Qt.PenCapStyle.FlatCap)
+        self.fill_top = QColor(color.red(), color.green(), color.blue(), 40)
+        self.fill_bottom = QColor(color.red(), color.green(), color.blue(), 10)
+
+        self.pixmap = None
+        self._pixmap_key = None
+        self._key = None
+        self._points_key = None  # Key of the downsampled points in the buffer, if any
+        self.downsampled = {}  # Zoom level name -> (width, series.total, ages, values)
+        self._drawn_total = 0  # series.total at the time of the last render
+        self._appended = 0  # Samples added since the last full redraw
+        self._scrolled = 0  # Device pixels scrolled since the last full redraw
+
+    def invalidate(self):
+        """Force a full redraw on the next render, e.g. after a rescale"""
+        self._key = None
+
+    def render(self, width, height, dpr, transform=None):
+        """Bring the buffer up to date with the series and return it
+
+        transform maps series values onto 0..1; invalidate() when it changes.
+        """
+        data = self.series.values(self.window)
+        if transform is not None:
+            data = transform(data)
+        self._points_key = None
+        key = (width, height, dpr, len(data))
+        new = self.series.total - self._drawn_total
+
+        if key != self._key or new < 0 or new > len(data) // 2:
+            self._full_redraw(data, width, height, dpr)
+            self._key = key
+        elif new:
+            self._draw_newest(data, new, width, height, dpr)
+
+        self._drawn_total = self.series.total
+        return self.pixmap
+
+    def render_points(self, key, ages, values, span, width, height, dpr):
+        """Draw points given by age in seconds (0 at the right edge) over span and return the buffer
+
+        The buffer is only redrawn when key changes.
+        """
+        if key != self._points_key:
+            self._clear(width, height, dpr)
+            self._key = None
+            self._points_key = key
+            xs = width * (1 + ages / span)
+            visible = xs >= 0
+            if np.count_nonzero(visible) >= 2:
+                self._draw_envelope(xs[visible], height * (1.0 - values[visible]), width, height, dpr)
+        return self.pixmap
+
+    def _draw_envelope(self, xs, ys, width, height, dpr):
+        """Draw dense points as one filled span per device pixel column"""
+        x, top, bottom = column_envelope(xs, ys, width, dpr)
+
+        painter = QPainter(self.pixmap)
+        painter.setPen(Qt.PenStyle.NoPen)
+
+        # Draw line
+        painter.setBrush(self.line_pen.color())
+        painter.drawRects(self._column_rects(x, top, bottom, self.line_pen.widthF(), dpr))
+
+        # Fill under the curve with a vertical gradient
+        gradient = QLinearGradient(0, 0, 0, height)
+        gradient.setColorAt(0, self.fill_top)
+        gradient.setColorAt(1, self.fill_bottom)
+        painter.setBrush(gradient)
+        painter.drawRects(self._column_rects(x, top, np.full(len(x), float(height)), 0.0, dpr))
+
+        # Add highlight effect on the line
+        painter.setBrush(self.highlight_pen.color())
+        painter.drawRects(self._column_rects(x, top, bottom, self.highlight_pen.widthF(), dpr))
+        painter.end()
+
+    def _column_rects(self, x, top, bottom, thickness, dpr):
+        """One device pixel wide rect per column, covering top to bottom widened by thickness"""
+        return [QRectF(left, upper - thickness / 2, 1 / dpr, lower - upper + thickness)
+                for left, upper, lower in zip(x.tolist(), top.tolist(), bottom.tolist())]
+
+    def _clear(self, width, height, dpr):
+        if self.pixmap is None or self._pixmap_key != (width, height, dpr):
+            self.pixmap = QPixmap(round(width * dpr), round(height * dpr))
+            self.pixmap.setDevicePixelRatio(dpr)
+            self._pixmap_key = (width, height, dpr)
+        self.pixmap.fill(Qt.GlobalColor.transparent)
+
+    def _full_redraw(self, data, width, height, dpr):
+        self._clear(width, height, dpr)
+        self._appended = 0
+        self._scrolled = 0
+
+        if len(data) < 2:
+            return
+
+        painter = QPainter(self.pixmap)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        self._draw_segments(painter, data, 0, width / (len(data) - 1), 0.0, height, dpr)
+        painter.end()
+
+    def _draw_newest(self, data, new, width, height, dpr):
+        dx = width / (len(data) - 1)
+
+        # Scroll by whole device pixels; the sub-pixel remainder becomes an x offset
+        self._appended += new
+        scrolled = round(self._appended * dx * dpr)
+        shift = scrolled - self._scrolled
+        self._scrolled = scrolled
+        offset = self._appended * dx - scrolled / dpr
+        self.pixmap.scroll(-shift, 0, self.pixmap.rect())
+
+        # Redraw from the last point that was already on screen to the right edge,
+        # widened by the stroke so joins around that point are repainted too
+        first = len(data) - 1 - new
+        margin = self.highlight_pen.widthF() / 2 + 1 / dpr
+        clip_x = math.floor((first * dx + offset - margin) * dpr) / dpr
+        clip = QRectF(clip_x, 0, width - clip_x, height)
+
+        painter = QPainter(self.pixmap)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setClipRect(clip)
+        painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_Clear)
+        painter.fillRect(clip, Qt.GlobalColor.transparent)
+        painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_SourceOver)
+
+        # Start early enough that every stroke reaching into the clip is drawn
+        # and the antialiased left edge of the fill stays outside of it
+        reach = self.highlight_pen.widthF() / 2 + 1 / dpr
+        start = max(math.floor((clip_x - reach - offset) / dx) - 1, 0)
+        self._draw_segments(painter, data[start:], start, dx, offset, height, dpr)
+        painter.end()
+
+    def _draw_segments(self, painter, data, start, dx, offset, height, dpr):
+        """Draw line, fill and highlight for data, whose first item is sample `start`"""
+        points = curve_points(data, dx, height, start, offset, subdivisions_for(dx, dpr))
+        line = to_polygon(points)
+
+        # Draw line
+        painter.setPen(self.line_pen)
+        painter.drawPolyline(line)
+
+        # Fill under the curve with a vertical gradient
+        gradient = QLinearGradient(0, 0, 0, height)
+        gradient.setColorAt(0, self.fill_top)
+        gradient.setColorAt(1, self.fill_bottom)
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(gradient)
+        painter.drawPolygon(fill_polygon(points, height))
+        painter.setBrush(Qt.BrushStyle.NoBrush)
+
+        # Add highlight effect on the line
+        painter.setPen(self.highlight_pen)
+        painter.drawPolyline(line)
+
+@instrument_class
+class SparklineGraph(QWidget):
+    """Graph area with a cached grid and one SparklineLayer per series
+
+    The mouse wheel steps through the zoom levels. Spans longer than the
+    live window are reduced to about two points per pixel column by the
+    downsampler, and read from the metric history when they reach further
+    back than the series.
+    """
+
+    MIN_TICK_SPACING = 14  # Pixels between labelled ticks
+
+    def __init__(self, parent=None, zoom_levels=ZOOM_LEVELS, sample_interval=1.0):
+        super().__init__(parent)
+        self.layers = []
+        self._background = None
+        self._background_key = None
+        self.zoom_levels = zoom_levels
+        self.zoom = 0
+        self.sample_interval = sample_interval  # Seconds between samples of the series
+        self.history = None  # MetricHistory, set by the owning widget
+        self.downsample = min_max
+
+        # AutoScale for series whose values are not already fractions of the height
+        self.autoscale = None
+        self.tick_format = lambda value: f"{value:g}"
+        self._pushed = []  # series.total of each layer already pushed to the autoscale
+
+    def add_series(self, series, color, history_field=None, history_scale=1.0):
+        layer = SparklineLayer(series, color, history_field, history_scale)
+        layer.window = round(self.zoom_levels[0].span / self.sample_interval)
+        self.layers.append(layer)
+        self._pushed.append(0)
+        return layer
+
+    def set_zoom(self, zoom):
+        zoom = max(0, min(zoom, len(self.zoom_levels) - 1))
+        if zoom != self.zoom:
+            self.zoom = zoom
+            self.invalidate()
+
+    def wheelEvent(self, event):
+        delta = event.angleDelta().y()
+        if delta:
+            # Scrolling down zooms out to longer spans
+            self.set_zoom(self.zoom + (1 if delta < 0 else -1))
+        event.accept()
+
+    def span_data(self, layer, span):
+        """Ages in seconds (0 is now) and values of layer's samples over the last span seconds"""
+        if span > layer.series.capacity * self.sample_interval and self.history is not None and layer.history_field:
+            level, records = self.history.recent(span)
+            if len(records):
+                ages = records['timestamp'] - time.time()
+                if level.rollup:
+                    # Both extremes of every bucket, so the downsampler keeps the spikes
+                    ages = np.repeat(ages, 2)
+                    values = np.column_stack((level.values(records, layer.history_field, 'min'),
+                                              level.values(records, layer.history_field, 'max'))).ravel()
+                else:
+                    values = level.values(records, layer.history_field)
+                return ages, values * layer.history_scale
+
+        ages = layer.series.times() - time.monotonic()
+        values = layer.series.values()
+        recent = ages >= -span  # Also drops the fill samples, whose time is NaN
+        return ages[recent], values[recent]
+
+    def downsampled(self, layer, level, width):
+        """(width, series.total, ages, values) of the last level.span seconds, cached per zoom level
+
+        The points are recomputed once the graph has scrolled by about a pixel.
+        """
+        samples_per_pixel = max(1, int(level.span / self.sample_interval / width))
+        cached = layer.downsampled.get(level.name)
+        if cached is None or cached[0] != width or layer.series.total - cached[1] >= samples_per_pixel:
+            ages, values = self.span_data(layer, level.span)
+            ages, values = self.downsample(ages, values, width)
+            cached = (width, layer.series.total, ages, values)
+            layer.downsampled[level.name] = cached
+        return cached
+
+    def update_scale(self):
+        """Push samples added since the last paint to the autoscale and return the live scale"""
+        for i, layer in enumerate(self.layers):
+            series = layer.series
+            new = min(series.total - self._pushed[i], len(series))
+            self._pushed[i] = series.total
+            if new > 0:
+                for timestamp, value in zip(series.times(new).tolist(), series.values(new).tolist()):
+                    self.autoscale.push(timestamp, value)
+        if self.autoscale.update():
+            # Everything drawn so far used the old scale
+            for layer in self.layers:
+                layer.invalidate()
+        return self.autoscale.scale
+
+    def invalidate(self):
+        """Redraw every series from scratch on the next paint"""
+        for layer in self.layers:
+            layer.invalidate()
+        self.update()
+
+    def render_background(self, dpr, scale=None):
+        pixmap = QPixmap(round(self.width() * dpr), round(self.height() * dpr))
+        pixmap.setDevicePixelRatio(dpr)
+        pixmap.fill(Qt.GlobalColor.transparent)
+
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+
+        # Draw background
+        painter.fillRect(self.rect(), QColor(30, 30, 35, 100))
+
+        # Draw grid lines
+        painter.setPen(QPen(QColor(255, 255, 255, 15), 1, Qt.PenStyle.DotLine))
+
+        # Horizontal grid lines, at the axis ticks when autoscaled
+        if self.autoscale is None:
+            for i in range(1, 4):
+                y = int(self.height() * (i / 4))
+                painter.drawLine(0, y, self.width(), y)
+        else:
+            # From the top down, skipping ticks too close to a label above them
+            ticks = []
+            for value, fraction in reversed(self.autoscale.ticks(scale)):
+                y = int(self.height() * (1 - fraction))
+                if (not ticks or y - ticks[-1][1] >= self.MIN_TICK_SPACING) and y < self.height() - 4:
+                    ticks.append((value, y))
+            for value, y in ticks:
+                painter.drawLine(0, y, self.width(), y)
+
+        # Vertical grid lines
+        step = self.width() / 10
+        for i in range(1, 10):
+            x = int(step * i)
+            painter.drawLine(x, 0, x, self.height())
+
+        font = QFont()
+        font.setPointSize(7)
+        painter.setFont(font)
+        painter.setPen(QColor(255, 255, 255, 90))
+
+        # Label the ticks just below their lines
+        if self.autoscale is not None:
+            for value, y in ticks:
+                painter.drawText(QRectF(4, y + 1, self.width() / 2, self.height()),
+                                 Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignTop,
+                                 self.tick_format(value))
+
+        # Name the span once zoomed out
+        if self.zoom:
+            painter.drawText(self.rect().adjusted(0, 2, -4, 0),
+                             Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignTop,
+                             self.zoom_levels[self.zoom].name)
+
+        painter.end()
+        return pixmap
+
+    def paintEvent(self, event):
+        dpr = self.devicePixelRatioF()
+        width, height = self.width(), self.height()
+        level = self.zoom_levels[self.zoom]
+
+        # Zoomed out, the scale fits the whole span shown instead of the live window
+        scale = None
+        if self.zoom:
+            points = [self.downsampled(layer, level, width) for layer in self.layers]
+            if self.autoscale is not None:
+                scale = self.autoscale.fit(max((float(np.nanmax(values)) for _, _, _, values in points if len(values)),
+                                               default=0.0))
+        elif self.autoscale is not None:
+            scale = self.update_scale()
+
+        key = (width, height, dpr, self.zoom, scale)
+        if key != self._background_key:
+            self._background = self.render_background(dpr, scale)
+            self._background_key = key
+
+        painter = QPainter(self)
+        painter.drawPixmap(0, 0, self._background)
+        transform = self.autoscale.normalize if self.autoscale is not None else None
+        for i, layer in enumerate(self.layers):
+            if self.zoom:
+                _, total, ages, values = points[i]
+                if transform is not None:
+                    values = transform(values, scale)
+                key = (level.name, total, width, height, dpr, scale)
+                pixmap = layer.render_points(key, ages, values, level.span, width, height, dpr)
+            else:
+                pixmap = layer.render(width, height, dpr, transform)
+            painter.drawPixmap(0, 0, pixmap)
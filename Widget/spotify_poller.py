@@ -0,0 +1,118 @@
+from PyQt6.QtCore import QObject, QThread, QTimer, pyqtSignal, pyqtSlot
+from PyQt6.QtWidgets import QApplication
+from work_scheduler import WorkScheduler
+import time
+
+class _PollWorker(QObject):
+    """Runs Spotify API calls on the poller thread"""
+    finished = pyqtSignal(bool, object, float)  # ok, playback, monotonic time of the reply
+
+    def __init__(self):
+        super().__init__()
+        self.spotify = None
+
+    @pyqtSlot()
+    def poll(self):
+        try:
+            playback = self.spotify.current_playback()
+        except Exception as e:
+            print(f"Error polling Spotify playback: {e}")
+            self.finished.emit(False, None, time.monotonic())
+            return
+        self.finished.emit(True, playback, time.monotonic())
+
+    @pyqtSlot(int)
+    def seek(self, position_ms):
+        try:
+            self.spotify.seek_track(position_ms)
+        except Exception as e:
+            print(f"Error seeking track position: {e}")
+        self.poll()
+
+class SpotifyPoller(QObject):
+    """Polls Spotify playback state on a background thread
+
+    Polls often while music is playing and rarely while paused; callers are
+    expected to interpolate progress locally between polls. Only one call is
+    in flight at a time, and seeks requested meanwhile collapse into the
+    latest one.
+    """
+    playback_changed = pyqtSignal(object, float)  # playback dict or None, monotonic time of the reply
+
+    # Polling intervals in ms
+    PLAYING_INTERVAL = 5000
+    PAUSED_INTERVAL = 15000
+
+    _poll_requested = pyqtSignal()
+    _seek_requested = pyqtSignal(int)
+
+    def __init__(self):
+        super().__init__()
+        self._in_flight = False
+        self._pending_seek = None  # Latest position to seek to once the call in flight returns
+
+        self._thread = QThread()
+        self._worker = _PollWorker()
+        self._worker.moveToThread(self._thread)
+
+        # Cross-thread connections, delivered as queued calls
+        self._poll_requested.connect(self._worker.poll)
+        self._seek_requested.connect(self._worker.seek)
+        self._worker.finished.connect(self._on_finished)
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.refresh)
+        # Owners add their widget so polling pauses while it is hidden
+        self.task = WorkScheduler.instance().register(self.timer, name='spotify')
+
+        app = QApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self.shutdown)
+
+    def set_client(self, spotify):
+        """Start polling with an authenticated spotipy client"""
+        self._worker.spotify = spotify
+        if not self._thread.isRunning():
+            self._thread.start()
+        self.refresh()
+
+    def refresh(self):
+        """Poll as soon as possible, e.g. after a playback control was used"""
+        if self._worker.spotify is None or self._in_flight:
+            return
+        self.task.stop()
+        self._in_flight = True
+        self._poll_requested.emit()
+
+    def seek(self, position_ms):
+        if self._worker.spotify is None:
+            return
+        self.task.stop()
+        # Replaces any seek still waiting to be sent
+        self._pending_seek = position_ms
+        if not self._in_flight:
+            self._send_seek()
+
+    def _send_seek(self):
+        position_ms, self._pending_seek = self._pending_seek, None
+        self._in_flight = True
+        self._seek_requested.emit(position_ms)
+
+    def _on_finished(self, ok, playback, replied_at):
+        self._in_flight = False
+        if self._pending_seek is not None:
+            # This reply predates the newer seek, so it is not published
+            self._send_seek()
+            return
+        playing = bool(playback and playback.get('is_playing'))
+        self.task.start(self.PLAYING_INTERVAL if playing else self.PAUSED_INTERVAL)
+        if ok:
+            self.playback_changed.emit(playback, replied_at)
+
+    def shutdown(self):
+        WorkScheduler.instance().unregister(self.task)
+        self.timer.stop()
+        if self._thread.isRunning():
+            self._thread.quit()
+            self._thread.wait()
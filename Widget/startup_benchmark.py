@@ -0,0 +1,118 @@
+from PyQt6.QtCore import QTimer, QT_VERSION_STR, PYQT_VERSION_STR
+import json
+import os
+import platform
+import sys
+import time
+
+def _ms(seconds):
+    return round(seconds * 1000, 3)
+
+def _timed_class(widget_class, record, start):
+    """Subclass recording when the first update_data and paintEvent complete"""
+
+    class Timed(widget_class):
+        def update_data(self, *args, **kwargs):
+            t = time.perf_counter()
+            result = super().update_data(*args, **kwargs)
+            if 'first_update_ms' not in record:
+                end = time.perf_counter()
+                record['first_update_ms'] = _ms(end - start)
+                record['first_update_duration_ms'] = _ms(end - t)
+            return result
+
+        def paintEvent(self, event):
+            t = time.perf_counter()
+            super().paintEvent(event)
+            if 'first_paint_ms' not in record:
+                end = time.perf_counter()
+                record['first_paint_ms'] = _ms(end - start)
+                record['first_paint_duration_ms'] = _ms(end - t)
+
+    Timed.__name__ = widget_class.__name__
+    Timed.__qualname__ = widget_class.__qualname__
+    return Timed
+
+def _without_history():
+    """Keep benchmark runs out of the on-disk metric history
+
+    Done once the sampler module has been imported by a widget, so its import
+    is still charged to that widget.
+    """
+    sampler = sys.modules.get('metrics_sampler')
+    if sampler is not None:
+        sampler.MetricsSampler.history_dir = None
+
+def run_startup_benchmark(config_path, output=None, timeout=10.0):
+    """Start every enabled widget offscreen and report where startup time goes
+
+    Times are in milliseconds. *_ms values for milestones are measured from
+    the start of the benchmark; *_duration_ms values are the cost of the call.
+    """
+    os.environ['QT_QPA_PLATFORM'] = 'offscreen'
+    start = time.perf_counter()
+
+    from widget_manager import WidgetManager
+    manager_import = time.perf_counter()
+    manager = WidgetManager(config_path)
+    app_ready = time.perf_counter()
+
+    results = {
+        'python': platform.python_version(),
+        'qt': QT_VERSION_STR,
+        'pyqt': PYQT_VERSION_STR,
+        'platform': sys.platform,
+        'manager_import_ms': _ms(manager_import - start),
+        'manager_init_ms': _ms(app_ready - manager_import),
+        'widgets': {},
+    }
+
+    for spec in manager.registry:
+        if not spec.enabled:
+            continue
+        record = results['widgets'][spec.name] = {'module': spec.module}
+
+        # Shared dependencies are charged to the first widget importing them
+        t = time.perf_counter()
+        record['already_imported'] = spec.module in sys.modules
+        try:
+            widget_class = spec.load()
+        except ImportError as e:
+            record['error'] = str(e)
+            continue
+        record['import_ms'] = _ms(time.perf_counter() - t)
+        _without_history()
+
+        timed_class = _timed_class(widget_class, record, start)
+        t = time.perf_counter()
+        try:
+            manager.add_widget(timed_class, spec.resolve_position(manager.screen), **spec.options)
+        except Exception as e:
+            record['error'] = str(e)
+            continue
+        record['construct_ms'] = _ms(time.perf_counter() - t)
+
+    results['all_constructed_ms'] = _ms(time.perf_counter() - start)
+
+    def pending():
+        return [r for r in results['widgets'].values()
+                if 'error' not in r and ('first_paint_ms' not in r or 'first_update_ms' not in r)]
+
+    def check():
+        if not pending() or time.perf_counter() - start > timeout:
+            manager.app.quit()
+
+    poll = QTimer()
+    poll.timeout.connect(check)
+    poll.start(5)
+    manager.app.exec()
+
+    results['all_ready_ms'] = _ms(time.perf_counter() - start)
+    results['timed_out'] = bool(pending())
+
+    report = json.dumps(results, indent=2)
+    if output:
+        with open(output, 'w', encoding='utf-8') as f:
+            f.write(report + '\n')
+    print(report)
+    return 1 if results['timed_out'] else 0
@@ -1,103 +1,31 @@
-from PyQt6.QtWidgets import QVBoxLayout, QHBoxLayout, QLabel, QProgressBar, QWidget
-from PyQt6.QtCore import Qt, QTimer, QRectF, QPointF
-from PyQt6.QtGui import QPainter, QColor, QFont, QPen, QPainterPath, QLinearGradient
+from PyQt6.QtWidgets import QVBoxLayout, QHBoxLayout, QLabel, QWidget
+from PyQt6.QtCore import Qt
+from PyQt6.QtGui import QColor
 from base_widget import BaseWidget
-import psutil
-from collections import deque
+from time_series import TimeSeries
+from sparkline import SparklineGraph
+from cpu_heatmap import CpuHeatmap
+from process_table import ProcessMonitor
+from metrics_sampler import MetricsSampler
+from binding import Observable, bind_text, bind_repaint
+from metric_history import monotonic_times
+import time
 
-class GraphWidget(QWidget):
+class GraphWidget(SparklineGraph):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setFixedSize(280, 60)
-        self.cpu_data = [0] * 50
-        self.memory_data = [0] * 50
+        # An hour of samples; the live view shows the last minute
+        self.cpu_data = TimeSeries(3600, fill=0)
+        self.memory_data = TimeSeries(3600, fill=0)
         
-    def paintEvent(self, event):
-        painter = QPainter(self)
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-        
-        # Draw background
-        painter.fillRect(self.rect(), QColor(30, 30, 35, 100))
-        
-        # Draw grid lines
-        painter.setPen(QPen(QColor(255, 255, 255, 15), 1, Qt.PenStyle.DotLine))
-        
-        # Horizontal grid lines
-        for i in range(1, 4):
-            y = int(self.height() * (i / 4))
-            painter.drawLine(0, y, self.width(), y)
-        
-        # Vertical grid lines
-        step = self.width() / 10
-        for i in range(1, 10):
-            x = int(step * i)
-            painter.drawLine(x, 0, x, self.height())
-        
-        # Draw CPU graph with smooth curve
-        self.draw_graph(painter, self.cpu_data, QColor(40, 120, 180, 180))  # Relaxed blue for CPU
-        
-        # Draw memory graph with smooth curve
-        self.draw_graph(painter, self.memory_data, QColor(120, 40, 180, 180))  # Relaxed purple for memory
-    
-    def draw_graph(self, painter, data, color):
-        if not data:
-            return
-        
-        # Calculate points
-        points = []
-        w = self.width()
-        h = self.height()
-        dx = w / (len(data) - 1)
-        
-        for i, value in enumerate(data):
-            x = i * dx
-            y = h * (1 - value)
-            points.append(QPointF(x, y))
-        
-        # Create smooth curve path
-        path = QPainterPath()
-        path.moveTo(points[0])
-        
-        # Use cubic bezier curves to create smooth lines
-        for i in range(1, len(points) - 2):
-            p1 = points[i]
-            p2 = points[i + 1]
-            
-            # Calculate control points
-            ctrl1 = QPointF((p1.x() + p2.x()) / 2, p1.y())
-            ctrl2 = QPointF((p1.x() + p2.x()) / 2, p2.y())
-            
-            path.cubicTo(ctrl1, ctrl2, p2)
-        
-        # Add last segment
-        if len(points) > 2:
-            path.lineTo(points[-1])
-        
-        # Draw line
-        pen = QPen(color, 1.5)
-        painter.setPen(pen)
-        painter.drawPath(path)
-        
-        # Create fill path
-        fill_path = QPainterPath(path)
-        fill_path.lineTo(w, h)
-        fill_path.lineTo(0, h)
-        fill_path.closeSubpath()
-        
-        # Create and apply gradient fill
-        gradient = QLinearGradient(0, 0, 0, h)
-        gradient.setColorAt(0, QColor(color.red(), color.green(), color.blue(), 40))
-        gradient.setColorAt(1, QColor(color.red(), color.green(), color.blue(), 10))
-        painter.fillPath(fill_path, gradient)
-        
-        # Add highlight effect on the line
-        highlight = QPen(QColor(color.red(), color.green(), color.blue(), 100), 3)
-        painter.setPen(highlight)
-        painter.drawPath(path)
+        # CPU graph drawn first, memory graph on top
+        self.add_series(self.cpu_data, QColor(40, 120, 180, 180), 'cpu_percent', 0.01)  # Relaxed blue for CPU
+        self.add_series(self.memory_data, QColor(120, 40, 180, 180), 'memory_percent', 0.01)  # Relaxed purple for memory
 
 class SystemMonitorWidget(BaseWidget):
-    def __init__(self):
-        super().__init__(size=(300, 120))
+    def __init__(self, show_processes=False):
+        super().__init__(size=(300, 220 if show_processes else 120))
         self.title_label.setText("System Monitor")
         
         # Create main content layout
@@ -141,33 +69,93 @@ class SystemMonitorWidget(BaseWidget):
         
         content_layout.addWidget(stats_container)
         
-        # System monitor graph
+        # System monitor graph, or per-core heatmap in its place; double click switches
         self.graph = GraphWidget()
         content_layout.addWidget(self.graph)
+        self.heatmap = CpuHeatmap()
+        self.heatmap.hide()
+        content_layout.addWidget(self.heatmap)
+        
+        # Top processes by CPU and by memory, refreshed on a background thread
+        self.process_monitor = None
+        if show_processes:
+            processes_layout = QHBoxLayout()
+            processes_layout.setSpacing(8)
+            self.top_cpu_label = QLabel()
+            self.top_rss_label = QLabel()
+            for label in (self.top_cpu_label, self.top_rss_label):
+                label.setStyleSheet("color: rgba(180, 180, 180, 0.9); font-family: Consolas; font-size: 9px;")
+                label.setAlignment(Qt.AlignmentFlag.AlignTop | Qt.AlignmentFlag.AlignLeft)
+                processes_layout.addWidget(label)
+            content_layout.addLayout(processes_layout)
         
         self.layout.addLayout(content_layout)
         
-        # Update timer
-        self.update_timer = QTimer()
-        self.update_timer.timeout.connect(self.update_data)
-        self.update_timer.start(1000)  # Update every second
-        
-        # Initial update
-        self.update_data()
+        # Displayed values, rounded to what the labels show
+        self.cpu_percent = Observable()
+        self.memory_percent = Observable()
+        self.samples = Observable()
+        bind_text(self.cpu_value, self.cpu_percent, lambda value: f"{value:.1f}%")
+        bind_text(self.memory_value, self.memory_percent, lambda value: f"{value:.1f}%")
+        bind_repaint(self.graph, self.samples)
+        bind_repaint(self.heatmap, self.samples)
+        if show_processes:
+            self.top_cpu = Observable()
+            self.top_rss = Observable()
+            bind_text(self.top_cpu_label, self.top_cpu,
+                      lambda top: "\n".join(f"{name[:12]:<12} {cpu:5.1f}%" for name, cpu in top))
+            bind_text(self.top_rss_label, self.top_rss,
+                      lambda top: "\n".join(f"{name[:12]:<12} {megabytes:5d} MB" for name, megabytes in top))
+            self.process_monitor = ProcessMonitor()
+            self.process_monitor.refreshed.connect(self.update_processes)
+            self.process_monitor.add_widget(self)
+            self.process_monitor.start()
+        
+        # Start from the recorded history, then receive readings from the shared background sampler
+        self.load_history()
+        MetricsSampler.instance().subscribe(self.update_data)
+    
+    def load_history(self):
+        """Fill the graph with the samples recorded in the time span it shows"""
+        history = MetricsSampler.instance().history
+        if history is None:
+            return
+        self.graph.history = history
+        now = time.time()
+        records = history.query('1s', now - self.graph.cpu_data.capacity, now)
+        if not len(records):
+            return
+        times = monotonic_times(records['timestamp'])
+        self.graph.cpu_data.extend(records['cpu_percent'] / 100, times)
+        self.graph.memory_data.extend(records['memory_percent'] / 100, times)
+        self.samples.set(self.graph.cpu_data.total)
+    
+    def update_processes(self, top):
+        # Rounded to what the labels show, so unchanged lists skip the update
+        self.top_cpu.set(tuple((p.name, round(p.cpu_percent, 1)) for p in top.by_cpu))
+        self.top_rss.set(tuple((p.name, round(p.rss / (1024 * 1024))) for p in top.by_rss))
+    
+    def mouseDoubleClickEvent(self, event):
+        show_heatmap = self.heatmap.isHidden()
+        self.graph.setVisible(not show_heatmap)
+        self.heatmap.setVisible(show_heatmap)
+        # Per-core readings are only sampled while the heatmap shows them
+        if show_heatmap:
+            self.heatmap.clear()
+        MetricsSampler.instance().want_per_core(self, show_heatmap)
     
-    def update_data(self):
+    def update_data(self, snapshot):
         # Get CPU usage
-        cpu_percent = psutil.cpu_percent()
-        self.cpu_value.setText(f"{cpu_percent:.1f}%")
-        self.graph.cpu_data.append(cpu_percent / 100)
-        self.graph.cpu_data.pop(0)
+        cpu_percent = snapshot.cpu_percent
+        self.cpu_percent.set(round(cpu_percent, 1))
+        self.graph.cpu_data.append(cpu_percent / 100, snapshot.timestamp)
+        if not self.heatmap.isHidden():
+            self.heatmap.append(snapshot.cpu_per_core)
         
         # Get memory usage
-        memory = psutil.virtual_memory()
-        memory_percent = memory.percent
-        self.memory_value.setText(f"{memory_percent:.1f}%")
-        self.graph.memory_data.append(memory_percent / 100)
-        self.graph.memory_data.pop(0)
+        memory_percent = snapshot.memory_percent
+        self.memory_percent.set(round(memory_percent, 1))
+        self.graph.memory_data.append(memory_percent / 100, snapshot.timestamp)
         
         # Update graph
-        self.graph.update() 
\ No newline at end of file
+        self.samples.set(self.graph.cpu_data.total) 
\ No newline at end of file
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The widget modules import each other flat, as the app runs from Widget/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,59 @@
+import pytest
+from autoscale import nice_ceiling, nice_ticks, SlidingMax
+
+KB = (1, 1024)
+
+@pytest.mark.parametrize('value, expected', [
+    (0, 1.0),
+    (0.3, 0.5),
+    (1, 1),
+    (3, 5),
+    (7, 10),
+    (10, 10),
+    (11, 20),
+    (450, 500),
+])
+def test_nice_ceiling(value, expected):
+    assert nice_ceiling(value) == pytest.approx(expected)
+
+@pytest.mark.parametrize('value, expected', [
+    (900, 1000),      # Below 1024 the steps are plain numbers
+    (1020, 1024),     # One of the next unit is closer than 2000
+    (1500, 2048),     # 2 in units of 1024
+    (3 * 1024 ** 2, 5 * 1024 ** 2),
+])
+def test_nice_ceiling_across_units(value, expected):
+    assert nice_ceiling(value, (1, 1024, 1024 ** 2)) == expected
+
+def test_nice_ticks():
+    assert nice_ticks(10) == [5, 10]
+    assert nice_ticks(100, count=9) == [20, 40, 60, 80, 100]
+
+def test_nice_ticks_across_units():
+    # Counted in the unit of the scale
+    assert nice_ticks(2048, units=KB) == [1024, 2048]
+    # Below one unit, counted in the unit below
+    assert nice_ticks(1024, units=KB) == [500, 1000]
+    assert nice_ticks(5000, units=KB) == [2048, 4096]
+
+def test_sliding_max_expires_old_peaks():
+    window = SlidingMax(10)
+    window.push(0, 5)
+    window.push(1, 3)
+    assert window.max() == 5
+    # The peak at t=0 is exactly span old
+    window.push(10, 1)
+    assert window.max() == 3
+    window.push(11.5, 2)
+    assert window.max() == 2
+    window.push(12, 9)
+    assert window.max() == 9
+
+def test_sliding_max_keeps_latest_value_and_clears():
+    window = SlidingMax(10)
+    assert window.max() == 0.0
+    window.push(0, 4)
+    window.expire(100)
+    assert window.max() == 4
+    window.clear()
+    assert window.max() == 0.0
@@ -0,0 +1,48 @@
+from collections import namedtuple
+import pytest
+from battery_model import BatteryModel, BatteryState, LOW_BATTERY_PERCENT
+
+@pytest.mark.parametrize('state, interval', [
+    (BatteryState(100, True, None), BatteryModel.FULL_INTERVAL),
+    (BatteryState(60, True, None), BatteryModel.CHARGING_INTERVAL),
+    (BatteryState(60, False, 3600), BatteryModel.DISCHARGING_INTERVAL),
+    (BatteryState(LOW_BATTERY_PERCENT + BatteryModel.THRESHOLD_MARGIN + 1, False, 600),
+     BatteryModel.DISCHARGING_INTERVAL),
+    (BatteryState(LOW_BATTERY_PERCENT + BatteryModel.THRESHOLD_MARGIN, False, 600),
+     BatteryModel.THRESHOLD_INTERVAL),
+    (BatteryState(5, False, 60), BatteryModel.THRESHOLD_INTERVAL),
+])
+def test_interval_follows_state(state, interval):
+    model = BatteryModel(backend=object())
+    model.update(state)
+    assert model.interval() == interval
+
+def test_interval_before_and_without_a_battery():
+    model = BatteryModel(backend=object())
+    # Not read yet: poll again soon
+    assert model.interval() == BatteryModel.DISCHARGING_INTERVAL
+    model.update(None)
+    assert model.interval() == BatteryModel.NO_BATTERY_INTERVAL
+
+Reading = namedtuple('Reading', ['percent', 'power_plugged', 'secsleft'])
+
+class FakeBackend:
+    def __init__(self):
+        self.battery = None
+
+    def sensors_battery(self):
+        return self.battery
+
+def test_poll_reports_whole_percent_and_plug_changes():
+    backend = FakeBackend()
+    model = BatteryModel(backend)
+    backend.battery = Reading(55.7, 0, 1200)
+    assert model.poll()
+    assert model.state == BatteryState(55, False, 1200)
+    backend.battery = Reading(55.2, 0, 1100)
+    assert not model.poll()
+    backend.battery = Reading(55.2, 1, None)
+    assert model.poll()
+    backend.battery = None
+    assert model.poll()
+    assert model.state is None
@@ -0,0 +1,34 @@
+import numpy as np
+from downsample import min_max
+
+def test_min_max_keeps_extremes_of_each_bucket():
+    # Span 100 over 10 buckets: bucket k covers x in [10k, 10k + 10), the last one includes 100
+    x = np.arange(101, dtype=np.float64)
+    y = np.random.default_rng(1).uniform(-10, 10, len(x))
+    y[9] = 50     # Last point of the first bucket
+    y[10] = -50   # First point of the second bucket
+    y[100] = 80   # Right edge, in the last bucket
+
+    kept_x, kept_y = min_max(x, y, 10)
+    assert len(kept_x) <= 20
+    assert np.all(np.diff(kept_x) > 0)
+
+    buckets = np.minimum(x // 10, 9)
+    kept_buckets = np.minimum(kept_x // 10, 9)
+    for bucket in range(10):
+        values = y[buckets == bucket]
+        assert sorted(kept_y[kept_buckets == bucket]) == [values.min(), values.max()]
+    assert {50, -50, 80} <= set(kept_y)
+
+def test_min_max_short_input_is_unchanged_without_nan():
+    x = [0, 1, 2, 3, 4]
+    y = [1, np.nan, 3, 4, 5]
+    kept_x, kept_y = min_max(x, y, 10)
+    assert kept_x.tolist() == [0, 2, 3, 4]
+    assert kept_y.tolist() == [1, 3, 4, 5]
+
+def test_min_max_zero_span_keeps_ends():
+    x = np.zeros(50)
+    y = np.arange(50, dtype=np.float64)
+    kept_x, kept_y = min_max(x, y, 5)
+    assert kept_y.tolist() == [0, 49]
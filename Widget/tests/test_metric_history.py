@@ -0,0 +1,54 @@
+import os
+import numpy as np
+import pytest
+from metric_history import Level, MetricHistory
+
+# Small segments so a test crosses several of them
+LEVELS = [
+    Level('1s', 1, 10, 3, rollup=False),
+    Level('10s', 10, 100, 2, rollup=True),
+]
+START = 1000.0
+
+@pytest.fixture
+def history(tmp_path):
+    history = MetricHistory(str(tmp_path), levels=LEVELS)
+    yield history
+    history.close()
+
+def test_raw_samples_round_trip(history):
+    for i in range(20):
+        history.append(START + i, cpu_percent=i, memory_percent=50)
+    records = history.query('1s', START, START + 20)
+    assert records['timestamp'].tolist() == [START + i for i in range(20)]
+    assert records['cpu_percent'].tolist() == list(range(20))
+    assert np.isnan(records['battery_percent']).all()
+
+def test_rollup_min_max_avg(history):
+    for i in range(25):
+        history.append(START + i, cpu_percent=i)
+    records = history.query('10s', START, START + 30)
+    assert records['timestamp'].tolist() == [START, START + 10, START + 20]
+    assert records['count'].tolist() == [10, 10, 5]
+    assert records['min']['cpu_percent'].tolist() == [0, 10, 20]
+    assert records['max']['cpu_percent'].tolist() == [9, 19, 24]
+    assert records['avg']['cpu_percent'] == pytest.approx([4.5, 14.5, 22])
+
+def test_rotation_keeps_retention_segments(history, tmp_path):
+    for i in range(60):
+        history.append(START + i, cpu_percent=i)
+    raw = sorted(name for name in os.listdir(tmp_path) if name.startswith('1s-'))
+    assert raw == ['1s-1030.npy', '1s-1040.npy', '1s-1050.npy']
+    records = history.query('1s', START, START + 60)
+    assert records['timestamp'][0] == START + 30
+    assert len(records) == 30
+
+def test_reader_sees_writes_and_cannot_write(history, tmp_path):
+    history.append(START, cpu_percent=7)
+    reader = MetricHistory(str(tmp_path), levels=LEVELS, writer=False)
+    try:
+        assert not reader.writable
+        reader.append(START + 1, cpu_percent=8)
+        assert reader.query('1s', START, START + 10)['cpu_percent'].tolist() == [7]
+    finally:
+        reader.close()
@@ -0,0 +1,88 @@
+import os
+import pytest
+from metrics_backend import InterfaceCounters, ProcBackend
+
+STAT = """\
+cpu  100 0 50 800 50 0 0 0 0 0
+cpu0 60 0 30 380 30 0 0 0 0 0
+cpu1 40 0 20 420 20 0 0 0 0 0
+intr 12345 1 2 3
+ctxt 999
+"""
+
+STAT_LATER = """\
+cpu  200 0 100 850 50 0 0 0 0 0
+cpu0 120 0 60 400 30 0 0 0 0 0
+cpu1 80 0 40 450 20 0 0 0 0 0
+intr 12400 1 2 3
+ctxt 1200
+"""
+
+MEMINFO = """\
+MemTotal:       16000000 kB
+MemFree:         2000000 kB
+MemAvailable:    4000000 kB
+Buffers:          100000 kB
+"""
+
+NET_HEADER = """\
+Inter-|   Receive                                                |  Transmit
+ face |bytes    packets errs drop fifo frame compressed multicast|bytes    packets errs drop fifo colls carrier compressed
+"""
+
+NET_DEV = NET_HEADER + """\
+    lo:    1000      10    0    0    0     0          0         0     1000      10    0    0    0     0       0          0
+  eth0:  123456     100    0    0    0     0          0         0   654321      90    0    0    0     0       0          0
+"""
+
+@pytest.fixture
+def proc(tmp_path, monkeypatch):
+    """Writes sample /proc files and opens a ProcBackend reading them"""
+    files = {
+        '/proc/stat': tmp_path / 'stat',
+        '/proc/meminfo': tmp_path / 'meminfo',
+        '/proc/net/dev': tmp_path / 'net_dev',
+    }
+    files['/proc/stat'].write_text(STAT)
+    files['/proc/meminfo'].write_text(MEMINFO)
+    files['/proc/net/dev'].write_text(NET_DEV)
+    real_open = os.open
+    monkeypatch.setattr(os, 'open', lambda path, flags: real_open(files[path], flags))
+    backend = ProcBackend()
+    yield backend, files
+    for fd in (backend._stat, backend._meminfo, backend._net_dev):
+        os.close(fd)
+
+def test_cpu_percent(proc):
+    backend, files = proc
+    assert backend.cpu_percent() == 0.0
+    assert backend.cpu_percent_per_core() == [0.0, 0.0]
+    files['/proc/stat'].write_text(STAT_LATER)
+    # Busy is everything but idle and iowait: 150 of 200 jiffies
+    assert backend.cpu_percent() == 75.0
+    assert backend.cpu_percent_per_core() == [81.8, 66.7]
+
+def test_per_core_without_cpu_percent_reads_the_file(proc):
+    backend, files = proc
+    backend.cpu_percent_per_core()
+    files['/proc/stat'].write_text(STAT_LATER)
+    assert backend.cpu_percent_per_core() == [81.8, 66.7]
+
+def test_memory_percent(proc):
+    backend, files = proc
+    assert backend.memory_percent() == 75.0
+
+def test_net_io_counters(proc):
+    backend, files = proc
+    assert backend.net_io_counters() == {
+        'lo': InterfaceCounters(bytes_sent=1000, bytes_recv=1000),
+        'eth0': InterfaceCounters(bytes_sent=654321, bytes_recv=123456),
+    }
+
+def test_net_io_counters_larger_than_one_read(proc):
+    backend, files = proc
+    line = "veth{0}: {0} 1 0 0 0 0 0 0 {1} 1 0 0 0 0 0 0\n"
+    files['/proc/net/dev'].write_text(NET_HEADER + "".join(line.format(i, i * 2) for i in range(3000)))
+    counters = backend.net_io_counters()
+    assert len(counters) == 3000
+    assert counters['veth2999'] == InterfaceCounters(bytes_sent=5998, bytes_recv=2999)
@@ -0,0 +1,61 @@
+import math
+import pytest
+from metrics_backend import InterfaceCounters
+from network_rates import NetworkRateEstimator
+
+def test_rates_from_counter_deltas():
+    estimator = NetworkRateEstimator()
+    estimator.add(0, {'eth0': InterfaceCounters(1000, 2000)})
+    estimator.add(2, {'eth0': InterfaceCounters(2000, 6000)})
+    rates = estimator.take_bucket()
+    # The first measured rate is used as is
+    assert rates.upload == pytest.approx(500)
+    assert rates.download == pytest.approx(2000)
+    assert rates.upload_avg == pytest.approx(500)
+    assert rates.download_avg == pytest.approx(2000)
+    assert rates.samples == 2
+    assert estimator.bytes_sent == 2000
+    assert estimator.bytes_recv == 6000
+
+def test_smoothing_weight_follows_interval():
+    estimator = NetworkRateEstimator(time_constant=1.5)
+    estimator.add(0, {'eth0': InterfaceCounters(0, 0)})
+    estimator.add(1, {'eth0': InterfaceCounters(100, 0)})
+    estimator.add(3, {'eth0': InterfaceCounters(700, 0)})
+    alpha = 1 - math.exp(-2 / 1.5)
+    assert estimator.take_bucket().upload == pytest.approx(100 + alpha * (300 - 100))
+
+def test_counter_wrap_skips_the_negative_delta():
+    estimator = NetworkRateEstimator()
+    estimator.add(0, {'eth0': InterfaceCounters(1000, 1000)})
+    estimator.add(1, {'eth0': InterfaceCounters(1500, 2000)})
+    estimator.take_bucket()
+
+    # Counters wrapped: no rate from this read, but it is the new reference
+    estimator.add(2, {'eth0': InterfaceCounters(100, 50)})
+    estimator.add(3, {'eth0': InterfaceCounters(300, 150)})
+    rates = estimator.take_bucket()
+    assert rates.upload_avg == pytest.approx(200 / 2)
+    assert rates.download_avg == pytest.approx(100 / 2)
+    assert rates.upload > 0 and rates.download > 0
+
+def test_interface_reset_starts_over():
+    estimator = NetworkRateEstimator()
+    estimator.add(0, {'eth0': InterfaceCounters(5000, 5000)})
+    estimator.add(1, {'eth0': InterfaceCounters(6000, 6000)})
+    # The interface goes away and comes back with fresh counters
+    estimator.add(2, {})
+    assert estimator.take_bucket().interfaces == {}
+    estimator.add(3, {'eth0': InterfaceCounters(0, 0)})
+    estimator.add(4, {'eth0': InterfaceCounters(600, 1200)})
+    rates = estimator.take_bucket()
+    assert rates.interfaces['eth0'].upload == pytest.approx(600)
+    assert rates.interfaces['eth0'].download == pytest.approx(1200)
+
+def test_repeated_timestamp_is_ignored():
+    estimator = NetworkRateEstimator()
+    estimator.add(1, {'eth0': InterfaceCounters(0, 0)})
+    estimator.add(1, {'eth0': InterfaceCounters(100, 100)})
+    estimator.add(2, {'eth0': InterfaceCounters(100, 100)})
+    rates = estimator.take_bucket()
+    assert rates.upload == pytest.approx(100)
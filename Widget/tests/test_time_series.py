@@ -0,0 +1,56 @@
+import numpy as np
+from time_series import TimeSeries
+
+def test_append_wraps_around_and_keeps_newest():
+    series = TimeSeries(4)
+    for i in range(1, 7):
+        series.append(i, timestamp=i * 10)
+    assert len(series) == 4
+    assert series.total == 6
+    assert series.values().tolist() == [3, 4, 5, 6]
+    assert series.times().tolist() == [30, 40, 50, 60]
+    assert series.values(2).tolist() == [5, 6]
+    assert series.last() == 6
+
+def test_views_are_contiguous_and_read_only():
+    series = TimeSeries(5)
+    for i in range(8):
+        series.append(i, timestamp=i)
+    for view in (series.values(), series.times(), series.values(3)):
+        assert view.flags.c_contiguous
+        assert not view.flags.writeable
+    # A view into the buffer, not a copy
+    assert np.shares_memory(series.values(), series._values)
+
+def test_partial_fill_and_oversized_window():
+    series = TimeSeries(4)
+    assert series.last() is None
+    series.append(1.5, timestamp=0)
+    series.append(2.5, timestamp=1)
+    assert series.values().tolist() == [1.5, 2.5]
+    assert series.values(10).tolist() == [1.5, 2.5]
+    assert series.values(0).tolist() == []
+
+def test_extend_wraps_and_drops_overflow():
+    series = TimeSeries(4)
+    for i in range(1, 4):
+        series.append(i, timestamp=i)
+    series.extend([4, 5], [4, 5])
+    assert series.values().tolist() == [2, 3, 4, 5]
+
+    series.extend(range(10, 20), range(10, 20))
+    assert series.values().tolist() == [16, 17, 18, 19]
+    assert series.times().tolist() == [16, 17, 18, 19]
+    assert series.total == 15
+
+    series.append(20, timestamp=20)
+    assert series.values().tolist() == [17, 18, 19, 20]
+
+def test_fill_and_clear():
+    series = TimeSeries(3, fill=0)
+    assert len(series) == 3
+    assert series.values().tolist() == [0, 0, 0]
+    assert np.isnan(series.times()).all()
+    series.clear()
+    assert len(series) == 0
+    assert series.last() is None
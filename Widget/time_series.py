@@ -0,0 +1,75 @@
+import numpy as np
+import time
+
+class TimeSeries:
+    """Fixed-capacity circular buffer of timestamped samples"""
+
+    def __init__(self, capacity, fill=None, dtype=np.float64):
+        self.capacity = capacity
+
+        # Every sample is stored twice, one capacity apart, so the most recent
+        # samples are always a single contiguous slice that can be returned as a view
+        self._values = np.zeros(capacity * 2, dtype=dtype)
+        self._times = np.zeros(capacity * 2, dtype=np.float64)
+        self._head = 0  # Slot of the next write
+        self._size = 0
+        self.total = 0  # Samples appended since creation
+
+        if fill is not None:
+            self._values[:] = fill
+            self._times[:] = np.nan
+            self._size = capacity
+
+    def __len__(self):
+        return self._size
+
+    def append(self, value, timestamp=None):
+        """Add a sample in O(1), overwriting the oldest one when full"""
+        if timestamp is None:
+            timestamp = time.monotonic()
+        i = self._head
+        self._values[i] = self._values[i + self.capacity] = value
+        self._times[i] = self._times[i + self.capacity] = timestamp
+        self._head = (i + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+        self.total += 1
+
+    def extend(self, values, timestamps):
+        """Append many samples at once, oldest first"""
+        values = np.asarray(values, dtype=self._values.dtype)
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        count = len(values)
+        # Only the newest capacity samples survive
+        values = values[-self.capacity:]
+        timestamps = timestamps[-self.capacity:]
+        slots = (self._head + np.arange(len(values))) % self.capacity
+        self._values[slots] = self._values[slots + self.capacity] = values
+        self._times[slots] = self._times[slots + self.capacity] = timestamps
+        self._head = (self._head + len(values)) % self.capacity
+        self._size = min(self._size + len(values), self.capacity)
+        self.total += count
+
+    def _window(self, buffer, n):
+        n = self._size if n is None else max(0, min(n, self._size))
+        end = self._head + self.capacity
+        view = buffer[end - n:end]
+        view.flags.writeable = False
+        return view
+
+    def values(self, n=None):
+        """Read-only view of the last n values (all by default), oldest first"""
+        return self._window(self._values, n)
+
+    def times(self, n=None):
+        """Read-only view of the timestamps matching values(n)"""
+        return self._window(self._times, n)
+
+    def last(self):
+        """Most recent value, or None when empty"""
+        if not self._size:
+            return None
+        return self._values[self._head - 1 + self.capacity]
+
+    def clear(self):
+        self._head = 0
+        self._size = 0
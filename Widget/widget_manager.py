@@ -1,21 +1,20 @@
 import sys
+import argparse
 from PyQt6.QtWidgets import QApplication
-from PyQt6.QtCore import Qt, QPoint
-from system_monitor_widget import SystemMonitorWidget
-from network_widget import NetworkWidget
-from battery_widget import BatteryWidget
-from music_widget import MusicWidget
+from widget_registry import load_registry, DEFAULT_CONFIG_PATH
+import instrumentation
 
 class WidgetManager:
-    def __init__(self):
+    def __init__(self, config_path=DEFAULT_CONFIG_PATH):
         self.app = QApplication(sys.argv)
         self.widgets = []
+        self.registry = load_registry(config_path)
         self.screen = self.app.primaryScreen().geometry()
         self._widget_spacing = 20  # Space between widgets
         
-    def add_widget(self, widget_class, position='top-right'):
+    def add_widget(self, widget_class, position='top-right', **options):
         """Add a new widget at the specified position"""
-        widget = widget_class()
+        widget = widget_class(**options)
         
         # Calculate position
         if position == 'top-right':
@@ -44,36 +43,58 @@ class WidgetManager:
         self.widgets.append(widget)
         return widget
     
+    def enable_profiling(self):
+        """Time every widget's paintEvent and update_data and show the overlay"""
+        instrumentation.enable()
+        for spec in self.registry:
+            if spec.name == 'profiler':
+                spec.enabled = True
+    
+    def add_registered_widget(self, spec):
+        """Import a registered widget's module and show the widget"""
+        try:
+            widget_class = spec.load()
+        except ImportError as e:
+            print(f"Error loading widget '{spec.name}': {e}")
+            return None
+        return self.add_widget(widget_class, spec.resolve_position(self.screen), **spec.options)
+    
     def run(self):
         """Start the widget manager"""
-        # Add system monitor widget at the top right
-        self.add_widget(SystemMonitorWidget, 'top-right')
-        
-        # Add network widget at the top left
-        self.add_widget(NetworkWidget, 'top-left')
-        
-        # Add battery widget at the center right
-        battery_pos = QPoint(
-            self.screen.width() - 200,
-            (self.screen.height() - 160) // 2
-        )
-        self.add_widget(BatteryWidget, battery_pos)
-        
-        # Add music widget at the bottom center
-        music_pos = QPoint(
-            (self.screen.width() - 380) // 2,  # Center horizontally
-            self.screen.height() - 130  # Position from bottom
-        )
-        self.add_widget(MusicWidget, music_pos)
+        # Only enabled widgets are imported and created
+        for spec in self.registry:
+            if spec.enabled:
+                self.add_registered_widget(spec)
         
         return self.app.exec()
 
 def main():
+    parser = argparse.ArgumentParser(description="Desktop widgets")
+    parser.add_argument('--config', default=DEFAULT_CONFIG_PATH, help="widget configuration file")
+    parser.add_argument('--benchmark', action='store_true',
+                        help="measure startup offscreen and print the results as JSON")
+    parser.add_argument('--output', help="also write benchmark results to this file")
+    parser.add_argument('--profile', action='store_true',
+                        help="time paint and update calls and show the profiler overlay")
+    parser.add_argument('--collector', nargs='?', const='desktop_widgets', metavar='NAME',
+                        help="read metrics from a shared collector process, starting one if needed")
+    args = parser.parse_args()
+    
     # Set application name and organization
     QApplication.setApplicationName("Desktop Widgets")
     QApplication.setOrganizationName("Widget System")
     
-    manager = WidgetManager()
+    if args.benchmark:
+        from startup_benchmark import run_startup_benchmark
+        sys.exit(run_startup_benchmark(args.config, args.output))
+    
+    if args.collector:
+        from metrics_sampler import MetricsSampler
+        MetricsSampler.collector_name = args.collector
+    
+    manager = WidgetManager(args.config)
+    if args.profile:
+        manager.enable_profiling()
     sys.exit(manager.run())
 
 if __name__ == "__main__":
@@ -0,0 +1,79 @@
+from PyQt6.QtCore import QPoint
+import importlib
+import json
+import os
+
+# Optional user configuration, looked up next to this file
+DEFAULT_CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'widgets.json')
+
+class WidgetSpec:
+    """Describes a widget by module path; the module is imported on first use"""
+
+    def __init__(self, name, module, class_name, position='top-right', enabled=True, options=None):
+        self.name = name
+        self.module = module
+        self.class_name = class_name
+        self.position = position  # Named position, [x, y], or callable(screen) -> QPoint
+        self.enabled = enabled
+        self.options = options or {}  # Keyword arguments for the widget constructor
+
+    def load(self):
+        """Import the widget module and return the widget class"""
+        module = importlib.import_module(self.module)
+        return getattr(module, self.class_name)
+
+    def resolve_position(self, screen):
+        """Position for WidgetManager.add_widget on the given screen geometry"""
+        if callable(self.position):
+            return self.position(screen)
+        if isinstance(self.position, (list, tuple)):
+            return QPoint(*self.position)
+        return self.position
+
+# Built-in widgets, in the order they are created
+DEFAULT_WIDGETS = [
+    WidgetSpec('system_monitor', 'system_monitor_widget', 'SystemMonitorWidget', 'top-right'),
+    WidgetSpec('network', 'network_widget', 'NetworkWidget', 'top-left'),
+    # Battery widget at the center right
+    WidgetSpec('battery', 'battery_widget', 'BatteryWidget',
+               lambda screen: QPoint(screen.width() - 200, (screen.height() - 160) // 2)),
+    # Music widget at the bottom center
+    WidgetSpec('music', 'music_widget', 'MusicWidget',
+               lambda screen: QPoint((screen.width() - 380) // 2, screen.height() - 130)),
+    # Paint and update timing overlay, shown with --profile
+    WidgetSpec('profiler', 'profiler_overlay', 'ProfilerOverlay', 'bottom-left', enabled=False),
+]
+
+def load_registry(config_path=DEFAULT_CONFIG_PATH):
+    """Built-in widgets merged with the optional JSON config
+
+    The config maps widget names to overrides, for example
+    {"music": {"enabled": false}, "battery": {"position": "top-right"}}.
+    Entries for unknown names add new widgets and need "module" and "class".
+    """
+    specs = {spec.name: WidgetSpec(spec.name, spec.module, spec.class_name,
+                                   spec.position, spec.enabled, dict(spec.options))
+             for spec in DEFAULT_WIDGETS}
+
+    config = {}
+    if config_path and os.path.exists(config_path):
+        try:
+            with open(config_path, 'r', encoding='utf-8') as f:
+                config = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Error reading widget config {config_path}: {e}")
+
+    for name, entry in config.items():
+        spec = specs.get(name)
+        if spec is None:
+            if 'module' not in entry or 'class' not in entry:
+                print(f"Skipping widget '{name}': config needs 'module' and 'class'")
+                continue
+            spec = specs[name] = WidgetSpec(name, entry['module'], entry['class'])
+        spec.module = entry.get('module', spec.module)
+        spec.class_name = entry.get('class', spec.class_name)
+        spec.position = entry.get('position', spec.position)
+        spec.enabled = entry.get('enabled', spec.enabled)
+        spec.options.update(entry.get('options', {}))
+
+    return list(specs.values())
@@ -0,0 +1,188 @@
+from PyQt6.QtCore import Qt, QObject, QEvent, QThread, QTimer, QMetaObject, Q_ARG, pyqtSignal
+from PyQt6.QtGui import QGuiApplication
+
+# Interval multiplier for periodic work while running on battery
+BATTERY_STRETCH = 2.0
+
+# Events that can change whether a widget is visible on some screen
+_VISIBILITY_EVENTS = (
+    QEvent.Type.Show,
+    QEvent.Type.Hide,
+    QEvent.Type.Expose,
+    QEvent.Type.Move,
+    QEvent.Type.WindowStateChange,
+)
+
+class ScheduledTask:
+    """Handle for a timer whose running state is decided by the WorkScheduler
+
+    Owners call start() and stop() on the task instead of the timer. The
+    timer then only runs while the task is wanted and one of its widgets is
+    visible, and its interval is stretched while on battery. Both methods
+    may be called from any thread.
+    """
+
+    def __init__(self, scheduler, timer, name, battery_stretch):
+        self.scheduler = scheduler
+        self.timer = timer
+        self.name = name
+        self.battery_stretch = battery_stretch
+        self.widgets = []  # Task only runs while one of these is visible; empty means always
+        self.interval = timer.interval()
+        self.wanted = False
+        self.running_interval = None  # Interval the timer was started with, None while stopped
+        self.requests = 0  # Number of start() calls
+        self.started_request = 0  # Value of requests when the timer was last started
+
+        if timer.isSingleShot():
+            # A single-shot timer stops itself once it fires
+            timer.timeout.connect(self._fired)
+
+    def start(self, interval=None):
+        """Request the timer to run, optionally with a new base interval in ms"""
+        if interval is not None:
+            self.interval = interval
+        self.wanted = True
+        self.requests += 1
+        self.scheduler._requested.emit(self)
+
+    def stop(self):
+        self.wanted = False
+        self.scheduler._requested.emit(self)
+
+    def is_active(self):
+        return self.wanted
+
+    def _fired(self):
+        # Unless the timeout handler already asked for the next shot
+        if self.requests == self.started_request:
+            self.wanted = False
+        self.running_interval = None
+
+class WorkScheduler(QObject):
+    """Central policy for every periodic task in the app
+
+    Timers registered here are paused while none of their widgets is visible
+    on a screen (hidden, minimized, not exposed e.g. on a locked session, or
+    moved off every screen) and run at stretched intervals on battery power.
+    Timers living on other threads are started and stopped through queued
+    calls on their own thread.
+    """
+    _requested = pyqtSignal(object)  # Task whose request changed, applied on the GUI thread
+
+    _instance = None
+
+    @classmethod
+    def instance(cls):
+        """Return the application-wide scheduler, creating it on first use"""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def __init__(self):
+        super().__init__()
+        self.tasks = []
+        self.on_battery = False
+        self._watched = set()  # Top-level widgets and windows with our event filter
+
+        # Calls from other threads are queued onto the GUI thread
+        self._requested.connect(self._apply)
+
+        # Re-evaluate once after a burst of visibility events, e.g. while dragging
+        self._refresh_timer = QTimer(self)
+        self._refresh_timer.setSingleShot(True)
+        self._refresh_timer.timeout.connect(self.refresh)
+
+    def register(self, timer, widget=None, name=None, battery_stretch=BATTERY_STRETCH):
+        """Put timer under the scheduler's control and return its ScheduledTask"""
+        task = ScheduledTask(self, timer, name or timer.objectName(), battery_stretch)
+        self.tasks.append(task)
+        if widget is not None:
+            self.add_widget(task, widget)
+        return task
+
+    def unregister(self, task):
+        if task in self.tasks:
+            self.tasks.remove(task)
+
+    def add_widget(self, task, widget):
+        """Let task run while widget is visible"""
+        if widget not in task.widgets:
+            task.widgets.append(widget)
+            widget.destroyed.connect(lambda *args, task=task, widget=widget: self._forget(task, widget))
+        top = widget.window()
+        self._watch(top)
+        # A window shown before it was watched still has to report its Expose events
+        if top.windowHandle() is not None:
+            self._watch(top.windowHandle())
+        self._requested.emit(task)
+
+    def set_on_battery(self, on_battery):
+        if on_battery != self.on_battery:
+            self.on_battery = on_battery
+            self.refresh()
+
+    def is_visible(self, widget):
+        """Whether any part of widget can currently be seen on a screen"""
+        if not widget.isVisible():
+            return False
+        top = widget.window()
+        if top.isMinimized():
+            return False
+        handle = top.windowHandle()
+        if handle is None or not handle.isExposed():
+            return False
+        geometry = top.frameGeometry()
+        return any(screen.geometry().intersects(geometry) for screen in QGuiApplication.screens())
+
+    def refresh(self):
+        """Re-apply the policy to every task"""
+        for task in list(self.tasks):
+            self._apply(task)
+
+    def _forget(self, task, widget):
+        if widget in task.widgets:
+            task.widgets.remove(widget)
+
+    def _watch(self, top):
+        if top not in self._watched:
+            self._watched.add(top)
+            top.installEventFilter(self)
+            top.destroyed.connect(lambda *args, top=top: self._watched.discard(top))
+
+    def eventFilter(self, obj, event):
+        if event.type() in _VISIBILITY_EVENTS:
+            # Expose events go to the native window, which exists once shown
+            handle = obj.windowHandle() if obj.isWidgetType() else None
+            if handle is not None:
+                self._watch(handle)
+            self._refresh_timer.start(0)
+        return False
+
+    def _apply(self, task):
+        if task not in self.tasks:
+            return
+        run = task.wanted and (not task.widgets or any(self.is_visible(w) for w in task.widgets))
+        if run:
+            stretch = task.battery_stretch if self.on_battery else 1.0
+            interval = int(task.interval * stretch)
+            # Like QTimer.start, a new request restarts the countdown
+            if task.running_interval != interval or task.started_request != task.requests:
+                task.running_interval = interval
+                task.started_request = task.requests
+                self._call(task.timer, "start", interval)
+        elif task.running_interval is not None:
+            task.running_interval = None
+            self._call(task.timer, "stop")
+
+    def _call(self, timer, method, interval=None):
+        """Start or stop timer on the thread it belongs to"""
+        if timer.thread() is QThread.currentThread():
+            if interval is None:
+                getattr(timer, method)()
+            else:
+                getattr(timer, method)(interval)
+        elif interval is None:
+            QMetaObject.invokeMethod(timer, method, Qt.ConnectionType.QueuedConnection)
+        else:
+            QMetaObject.invokeMethod(timer, method, Qt.ConnectionType.QueuedConnection, Q_ARG(int, interval))